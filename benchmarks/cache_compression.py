@@ -0,0 +1,76 @@
+"""Memory vs. read latency of TTLCache with and without compressed storage.
+
+Fills a cache with LocationProfile results shaped like get_location_profile output
+(50 features with full tag dicts) and reports traced memory plus per-read latency for
+hot (decoded LRU) and cold (decompress on access) reads.
+
+    python benchmarks/cache_compression.py [entries]
+"""
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+
+from outdoor_mcp.core.cache import TTLCache
+from outdoor_mcp.models.common import Coordinates, Provenance
+from outdoor_mcp.models.location import Location, LocationProfile, NearbyFeature
+
+
+def make_profile(i: int) -> tuple[LocationProfile, Provenance]:
+    center = Coordinates(lat=40.0 + i * 1e-4, lon=-105.0)
+    features = [
+        NearbyFeature(
+            kind="peak",
+            name=f"Feature {i}-{j}",
+            center=center,
+            tags={
+                "name": f"Feature {i}-{j}",
+                "natural": "peak",
+                "ele": str(3000 + j),
+                "wikidata": f"Q{100000 + j}",
+                "source": "survey",
+                "description": "Exposed summit ridge with loose rock; " * 3,
+                "opening_hours": "24/7",
+                "operator": "National Park Service",
+            },
+        )
+        for j in range(50)
+    ]
+    location = Location(id=f"coord:{center.lat:.6f}:{center.lon:.6f}", name="Location Anchor", kind="region", center=center)
+    return LocationProfile(location=location, features=features, summary={"feature_count": "50"}), Provenance(sources=["osm_overpass"])
+
+
+def run(label: str, entries: int, **cache_kwargs) -> None:
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    cache = TTLCache(default_ttl_s=3600, **cache_kwargs)
+    for i in range(entries):
+        cache.set(f"profile:{i}", make_profile(i))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def read(keys: list[str]) -> float:
+        start = time.perf_counter()
+        for k in keys:
+            cache.value_of(k, cache.get(k))
+        return (time.perf_counter() - start) / len(keys) * 1e6
+
+    hot_keys = [f"profile:{entries - 1 - (i % 8)}" for i in range(2000)]
+    cold_keys = [f"profile:{i}" for i in range(entries)]
+    hot_us = read(hot_keys)
+    cold_us = read(cold_keys)
+    print(f"{label:<22} {(used - base) / 1e6:>9.2f} MB {hot_us:>10.1f} us {cold_us:>10.1f} us")
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{entries} LocationProfile entries, 50 features each")
+    print(f"{'mode':<22} {'memory':>12} {'hot read':>13} {'cold read':>13}")
+    run("uncompressed", entries)
+    run("zlib (level 6)", entries, compress_min_bytes=4096, compress_level=6, hot_set_size=32)
+    run("zlib (level 1)", entries, compress_min_bytes=4096, compress_level=1, hot_set_size=32)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,39 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import socket
+import tempfile
+
+from .core.runtime import install_event_loop
+from .core.settings import settings
 from .server import OutdoorIntelligenceServer
 
 
-def main() -> None:
+def _serve(sock: socket.socket | None = None) -> None:
+    install_event_loop(settings.runtime_mode)
     server = OutdoorIntelligenceServer()
 
     async def runner():
         try:
-            await server.run()
+            await server.run(sock)
         finally:
             await server.close()
 
     asyncio.run(runner())
 
 
+def main() -> None:
+    if settings.workers > 1 and settings.transport != "stdio":
+        from .core.workers import serve_prefork
+
+        if not settings.shared_state_path:
+            # Workers must agree on one store, otherwise each gets its own cache and rate budget.
+            settings.shared_state_path = os.path.join(tempfile.gettempdir(), "outdoor_mcp_shared.sqlite3")
+        serve_prefork(settings.workers, settings.http_host, settings.http_port, _serve)
+        return
+    _serve()
+
+
 if __name__ == "__main__":
     main()
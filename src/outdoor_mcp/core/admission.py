@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from .exceptions import OverloadedError
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdmissionController:
+    """Bounds in-flight tool work globally and per tool, shedding load before it queues.
+
+    A request is rejected up front when the wait queue is full or when the predicted wait
+    (requests ahead of it times the EWMA service time, spread over the available slots)
+    exceeds the budget, instead of holding memory and sockets until the rate limiter times out.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tool_max_concurrency: int,
+        max_queue: int,
+        max_wait_s: float,
+        tool_limits: Optional[dict[str, int]] = None,
+    ):
+        self._max_concurrency = max_concurrency
+        self._tool_max_concurrency = tool_max_concurrency
+        self._tool_limits = tool_limits or {}
+        self._max_queue = max_queue
+        self._max_wait_s = max_wait_s
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._tools: dict[str, asyncio.Semaphore] = {}
+        self._waiting = 0
+        self._in_flight = 0
+        self._service_ewma_s = 0.0
+        self.admitted = 0
+        self.rejected = 0
+
+    def _tool_sem(self, tool: str) -> asyncio.Semaphore:
+        sem = self._tools.get(tool)
+        if sem is None:
+            sem = asyncio.Semaphore(self._tool_limits.get(tool, self._tool_max_concurrency))
+            self._tools[tool] = sem
+        return sem
+
+    def predicted_wait_s(self, tool: str) -> float:
+        if not self._global.locked() and not self._tool_sem(tool).locked():
+            return 0.0
+        return (self._waiting + 1) * self._service_ewma_s / max(1, self._max_concurrency)
+
+    def _reject(self, tool: str, reason: str, predicted: float) -> None:
+        self.rejected += 1
+        logger.warning("admission_rejected", tool=tool, reason=reason, waiting=self._waiting, predicted_wait_s=round(predicted, 3))
+        raise OverloadedError(
+            code="overloaded",
+            message="Server is at capacity. Please retry shortly.",
+            details={"tool": tool, "reason": reason, "retry_after_s": max(1, int(predicted or self._max_wait_s))},
+        )
+
+    @asynccontextmanager
+    async def admit(self, tool: str) -> AsyncIterator[None]:
+        tool_sem = self._tool_sem(tool)
+        predicted = self.predicted_wait_s(tool)
+        if (self._global.locked() or tool_sem.locked()) and self._waiting >= self._max_queue:
+            self._reject(tool, "queue_full", predicted)
+        if predicted > self._max_wait_s:
+            self._reject(tool, "predicted_wait", predicted)
+
+        self._waiting += 1
+        acquired_tool = acquired_global = False
+        try:
+            deadline = time.monotonic() + self._max_wait_s
+            try:
+                await asyncio.wait_for(tool_sem.acquire(), timeout=self._max_wait_s)
+                acquired_tool = True
+                await asyncio.wait_for(self._global.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+                acquired_global = True
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            self._waiting -= 1
+            if acquired_tool and not acquired_global:
+                tool_sem.release()
+        if not acquired_global:
+            self._reject(tool, "wait_timeout", self._max_wait_s)
+
+        self.admitted += 1
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._service_ewma_s = elapsed if self._service_ewma_s == 0 else 0.8 * self._service_ewma_s + 0.2 * elapsed
+            self._in_flight -= 1
+            self._global.release()
+            tool_sem.release()
+
+    def snapshot(self) -> dict[str, float | int]:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "service_ewma_s": round(self._service_ewma_s, 4),
+        }
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from .exceptions import ProviderError
+from .logging import get_logger
+from .shared_state import SharedStateStore
+
+logger = get_logger(__name__)
+
+# "user" for tool calls, "background" for pre-warming; background work is deferred once a budget runs low.
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("budget_priority", default="user")
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    token = _priority.set("background")
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class BudgetWindow:
+    limit: int
+    window_s: float
+    used: int = 0
+    window_start: float = 0.0
+
+    def roll(self, now: float) -> None:
+        if now - self.window_start >= self.window_s:
+            self.used = 0
+            self.window_start = now
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+
+class ProviderBudget:
+    """Counts upstream calls per provider against quota windows (e.g. 1000/day), persisted across restarts.
+
+    Providers without a configured limit are unbudgeted. When a provider drops below the low
+    watermark, callers are expected to lengthen TTLs and prefer stale data; background work is
+    refused outright so remaining quota goes to user-facing misses.
+
+    With a shared store the windows live in it and every debit is one transaction, so all
+    worker processes draw from the same quota; the JSON state file is only used without one.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, dict[str, float]],
+        *,
+        state_path: str = "",
+        low_watermark: float = 0.2,
+        low_ttl_multiplier: float = 4.0,
+        flush_interval_s: float = 5.0,
+        shared: Optional[SharedStateStore] = None,
+    ):
+        self._windows = {
+            name: BudgetWindow(limit=int(cfg["limit"]), window_s=float(cfg.get("window_s", 86400)))
+            for name, cfg in limits.items()
+        }
+        self._shared = shared
+        self._state_path = "" if shared is not None else state_path
+        self._low_watermark = low_watermark
+        self._low_ttl_multiplier = low_ttl_multiplier
+        self._flush_interval_s = flush_interval_s
+        self._dirty = False
+        self._last_flush = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        if not self._state_path or not os.path.exists(self._state_path):
+            return
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("budget_state_unreadable", path=self._state_path, error=str(e))
+            return
+        for name, saved in state.items():
+            window = self._windows.get(name)
+            if window is not None and float(saved.get("window_s", 0)) == window.window_s:
+                window.used = int(saved.get("used", 0))
+                window.window_start = float(saved.get("window_start", 0.0))
+
+    def flush(self, force: bool = False) -> None:
+        if not self._state_path or not self._dirty:
+            return
+        now = time.time()
+        if not force and now - self._last_flush < self._flush_interval_s:
+            return
+        tmp = f"{self._state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({name: asdict(w) for name, w in self._windows.items()}, f)
+        os.replace(tmp, self._state_path)
+        self._dirty = False
+        self._last_flush = now
+
+    def _window(self, provider: str) -> Optional[BudgetWindow]:
+        window = self._windows.get(provider)
+        if window is None:
+            return None
+        if self._shared is not None:
+            # None when the store is busy: the last known shared state is close enough then.
+            row = self._shared.budget_get(provider)
+            if row is not None and row[2] == window.window_s:
+                window.used, window.window_start = row[0], row[1]
+        window.roll(time.time())
+        return window
+
+    def remaining_fraction(self, provider: str) -> float:
+        window = self._window(provider)
+        if window is None or window.limit <= 0:
+            return 1.0
+        return window.remaining / window.limit
+
+    def is_low(self, providers: Iterable[str]) -> bool:
+        return any(self.remaining_fraction(p) < self._low_watermark for p in providers)
+
+    def ttl_multiplier(self, providers: Iterable[str]) -> float:
+        return self._low_ttl_multiplier if self.is_low(providers) else 1.0
+
+    def _reserve(self, window: BudgetWindow, priority: Optional[str] = None) -> float:
+        # Quota that must be left in the window before a call of this priority may spend from it.
+        if (priority or _priority.get()) == "background":
+            return max(1.0, window.limit * self._low_watermark)
+        return 1.0
+
+    def allow(self, provider: str, priority: Optional[str] = None) -> bool:
+        window = self._window(provider)
+        if window is None:
+            return True
+        return window.remaining >= self._reserve(window, priority)
+
+    def _exhausted(self, provider: str, window: BudgetWindow) -> ProviderError:
+        return ProviderError(
+            code="quota_exhausted",
+            message=f"Upstream quota for {provider} is exhausted for the current window.",
+            details={
+                "provider": provider,
+                "priority": _priority.get(),
+                "resets_in_s": int(window.window_start + window.window_s - time.time()),
+            },
+        )
+
+    def check(self, provider: str) -> None:
+        """Raise quota_exhausted if the current priority may not use the budget, without debiting it."""
+        window = self._window(provider)
+        if window is not None and window.remaining < self._reserve(window):
+            raise self._exhausted(provider, window)
+
+    def spend(self, provider: str) -> None:
+        """Debit one call, raising quota_exhausted if the current priority may not use the budget."""
+        window = self._windows.get(provider)
+        if window is None:
+            return
+        if self._shared is not None:
+            debit = self._shared.budget_spend(provider, window.limit, window.window_s, self._reserve(window))
+            if debit is not None:
+                granted, window.used, window.window_start = debit
+            else:
+                # Never fail or stall a call on store contention; count it against this process's view.
+                logger.warning("budget_store_busy", provider=provider)
+                granted = window.remaining >= self._reserve(window)
+                if granted:
+                    window.used += 1
+            if not granted:
+                raise self._exhausted(provider, window)
+            return
+        window.roll(time.time())
+        if window.remaining < self._reserve(window):
+            raise self._exhausted(provider, window)
+        window.used += 1
+        self._dirty = True
+        self.flush()
+
+    def snapshot(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for name in self._windows:
+            window = self._window(name)
+            assert window is not None
+            out[name] = {
+                "limit": window.limit,
+                "used": window.used,
+                "remaining": window.remaining,
+                "window_s": window.window_s,
+                "resets_in_s": int(window.window_start + window.window_s - time.time()),
+                "low": window.remaining / max(1, window.limit) < self._low_watermark,
+            }
+        return out
@@ -1,74 +1,382 @@
 from __future__ import annotations
 
-import asyncio
+import pickle
+import sys
 import time
-from dataclasses import dataclass
-from typing import Any, Callable, Optional, TypeVar
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from .exceptions import AppError
+from .logging import get_logger
+from .shared_state import SharedStateStore
+from .singleflight import SingleFlight
+
+logger = get_logger(__name__)
 
 T = TypeVar("T")
 
+# Upper bounds (seconds) of the age histogram buckets reported by TTLCache.stats().
+_AGE_BUCKETS_S = (60, 300, 900, 3600, 21600)
+_AGE_LABELS = ("<1m", "<5m", "<15m", "<1h", "<6h", ">=6h")
+
 
 @dataclass
 class CacheEntry:
     value: Any
     expires_at: float
     created_at: float
+    size_bytes: int = 0
+    hits: int = 0
+    # When True, `value` holds zlib-compressed pickle bytes; use TTLCache.value_of() to read it.
+    compressed: bool = False
+
+
+@dataclass
+class FamilyStats:
+    """Counters for one key family (the key prefix before the first ':'), maintained on every write."""
+
+    entries: int = 0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    created_minutes: Counter = field(default_factory=Counter)
+
+
+def _family(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _encode(value: Any) -> Optional[bytes]:
+    try:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+def _estimate_size(value: Any, budget: int = 256) -> int:
+    """Rough deep size in bytes, visiting at most `budget` objects; cheap next to pickling."""
+    total = 0
+    stack = [value]
+    seen = 0
+    while stack and seen < budget:
+        obj = stack.pop()
+        seen += 1
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+            total += sum(sys.getsizeof(k) for k in obj)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    if stack:
+        # Budget ran out: extrapolate from the part that was measured.
+        total += len(stack) * total // seen
+    return total
+
+
+@dataclass
+class NegativeEntry:
+    error: AppError
+    expires_at: float
+    failures: int
 
 
 class TTLCache:
-    def __init__(self, default_ttl_s: int):
+    def __init__(
+        self,
+        default_ttl_s: int,
+        shared: Optional[SharedStateStore] = None,
+        *,
+        negative_ttls: Optional[dict[str, float]] = None,
+        negative_max_ttl_s: float = 300.0,
+        compress_min_bytes: int = 0,
+        compress_level: int = 6,
+        hot_set_size: int = 128,
+        stale_grace_s: int = 0,
+    ):
         self._default_ttl_s = default_ttl_s
+        # Expired entries are kept this long so callers can fall back to them (see get_stale).
+        self._stale_grace_s = stale_grace_s
+        self._shared = shared
         self._store: dict[str, CacheEntry] = {}
-        self._inflight: dict[str, asyncio.Task] = {}
-        self._inflight_lock = asyncio.Lock()
+        # Values whose pickle reaches compress_min_bytes are kept zlib-compressed; the most recently
+        # read ones stay decoded in a small LRU so hot keys skip decompression.
+        self._compress_min_bytes = compress_min_bytes
+        self._compress_level = compress_level
+        self._hot_set_size = hot_set_size
+        self._decoded: OrderedDict[str, Any] = OrderedDict()
+        # Failed lookups are remembered separately so they never count as (or evict) real entries.
+        self._negative_ttls = negative_ttls or {}
+        self._negative_max_ttl_s = negative_max_ttl_s
+        self._negative: dict[str, NegativeEntry] = {}
+        self.negative_hits = 0
+        self._families: dict[str, FamilyStats] = {}
+        # Bounded heavy-hitter table for top-K reporting; avoids scanning the store.
+        self._hot_keys: dict[str, int] = {}
+        self._hot_capacity = 64
+        self._flights = SingleFlight()
 
     def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._get_local(key)
+        if entry is None:
+            # Another worker may have filled or refreshed the key in the meantime.
+            return self._get_shared(key)
+        return entry
+
+    def _get_local(self, key: str) -> Optional[CacheEntry]:
         entry = self._store.get(key)
         if not entry:
             return None
-        if time.time() >= entry.expires_at:
-            self._store.pop(key, None)
+        now = time.time()
+        if now >= entry.expires_at:
+            if now >= entry.expires_at + self._stale_grace_s:
+                self._evict(key)
+            return None
+        return entry
+
+    def preload(self, limit: int) -> int:
+        """Copy up to `limit` live entries from the shared store (e.g. precomputed ones) into memory."""
+        if self._shared is None or limit <= 0:
+            return 0
+        loaded = 0
+        for key, blob, expires_at, created_at in self._shared.cache_items(limit):
+            entry = self._entry_from_blob(key, blob, expires_at, created_at)
+            if entry is not None:
+                self._insert(key, entry)
+                loaded += 1
+        return loaded
+
+    def get_stale(self, key: str) -> Optional[tuple[Any, dict[str, Any]]]:
+        """Return an entry even if expired, as long as it is within the stale grace period."""
+        entry = self._store.get(key)
+        now = time.time()
+        if entry is None or now >= entry.expires_at + self._stale_grace_s:
+            return None
+        self._record_hit(key, entry)
+        meta = {
+            "hit": True,
+            "age_s": int(now - entry.created_at),
+            "ttl_s": int(entry.expires_at - entry.created_at),
+            "stale": now >= entry.expires_at,
+        }
+        return self.value_of(key, entry), meta
+
+    def _get_shared(self, key: str) -> Optional[CacheEntry]:
+        if self._shared is None:
+            return None
+        row = self._shared.cache_get(key)
+        if row is None:
             return None
+        blob, expires_at, created_at = row
+        entry = self._entry_from_blob(key, blob, expires_at, created_at)
+        if entry is None:
+            return None
+        self._insert(key, entry)
         return entry
 
+    def _entry_from_blob(self, key: str, blob: bytes, expires_at: float, created_at: float) -> Optional[CacheEntry]:
+        # Large values are compressed straight from the stored pickle, without a decode/encode round trip.
+        if self._compress_min_bytes and len(blob) >= self._compress_min_bytes:
+            packed = zlib.compress(blob, self._compress_level)
+            return CacheEntry(value=packed, expires_at=expires_at, created_at=created_at, size_bytes=len(packed), compressed=True)
+        try:
+            value = pickle.loads(blob)
+        except Exception as e:
+            logger.warning("shared_cache_decode_failed", key=key, error=str(e))
+            return None
+        return CacheEntry(value=value, expires_at=expires_at, created_at=created_at, size_bytes=len(blob))
+
+    def _make_entry(self, value: Any, expires_at: float, created_at: float, blob: Optional[bytes] = None) -> CacheEntry:
+        if blob is None and self._compress_min_bytes and _estimate_size(value) >= self._compress_min_bytes // 2:
+            # Only likely compression candidates are pickled to measure them exactly.
+            blob = _encode(value)
+        if blob is None:
+            return CacheEntry(value=value, expires_at=expires_at, created_at=created_at, size_bytes=_estimate_size(value))
+        if self._compress_min_bytes and len(blob) >= self._compress_min_bytes:
+            packed = zlib.compress(blob, self._compress_level)
+            return CacheEntry(value=packed, expires_at=expires_at, created_at=created_at, size_bytes=len(packed), compressed=True)
+        return CacheEntry(value=value, expires_at=expires_at, created_at=created_at, size_bytes=len(blob))
+
+    def value_of(self, key: str, entry: CacheEntry) -> Any:
+        if not entry.compressed:
+            return entry.value
+        if key in self._decoded:
+            self._decoded.move_to_end(key)
+            return self._decoded[key]
+        value = pickle.loads(zlib.decompress(entry.value))
+        self._remember_decoded(key, value)
+        return value
+
+    def _remember_decoded(self, key: str, value: Any) -> None:
+        if self._hot_set_size <= 0:
+            return
+        self._decoded[key] = value
+        self._decoded.move_to_end(key)
+        while len(self._decoded) > self._hot_set_size:
+            self._decoded.popitem(last=False)
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        self._evict(key)
+        self._store[key] = entry
+        fam = self._families.setdefault(_family(key), FamilyStats())
+        fam.entries += 1
+        fam.bytes += entry.size_bytes
+        fam.created_minutes[int(entry.created_at // 60)] += 1
+
+    def _evict(self, key: str) -> None:
+        self._decoded.pop(key, None)
+        entry = self._store.pop(key, None)
+        if entry is None:
+            return
+        fam = self._families[_family(key)]
+        fam.entries -= 1
+        fam.bytes -= entry.size_bytes
+        minute = int(entry.created_at // 60)
+        fam.created_minutes[minute] -= 1
+        if fam.created_minutes[minute] <= 0:
+            del fam.created_minutes[minute]
+
+    def _record_hit(self, key: str, entry: CacheEntry) -> None:
+        entry.hits += 1
+        self._families.setdefault(_family(key), FamilyStats()).hits += 1
+        hot = self._hot_keys
+        if key in hot or len(hot) < self._hot_capacity:
+            hot[key] = entry.hits
+            return
+        coldest = min(hot, key=hot.__getitem__)
+        if entry.hits > hot[coldest]:
+            del hot[coldest]
+            hot[key] = entry.hits
+
     def set(self, key: str, value: Any, ttl_s: Optional[int] = None) -> None:
         ttl = ttl_s if ttl_s is not None else self._default_ttl_s
         now = time.time()
-        self._store[key] = CacheEntry(value=value, expires_at=now + ttl, created_at=now)
+        # Pickled only when the shared store needs the bytes; _make_entry decides for compression.
+        blob = _encode(value) if self._shared is not None else None
+        entry = self._make_entry(value, now + ttl, now, blob=blob)
+        self._insert(key, entry)
+        if entry.compressed:
+            # Freshly produced values are about to be read by the caller that asked for them.
+            self._remember_decoded(key, value)
+        if self._shared is not None:
+            self._shared.cache_set(key, value, entry.expires_at, entry.created_at, blob=blob)
+
+    def is_warm(self, key: str) -> bool:
+        """True when get_or_set(key) would return a value without starting a new factory call.
+
+        Negatively cached keys are not warm: their callers may still need a stale fallback. Only
+        process memory is checked; entries found in the shared store are read by get_or_set.
+        """
+        return key in self._flights or self._get_local(key) is not None
+
+    @property
+    def negative_size(self) -> int:
+        return len(self._negative)
+
+    def get_negative(self, key: str) -> Optional[NegativeEntry]:
+        entry = self._negative.get(key)
+        if entry is None or time.time() >= entry.expires_at:
+            return None
+        return entry
+
+    def set_negative(self, key: str, error: AppError) -> Optional[NegativeEntry]:
+        """Remember a failure for `key` if its error code is negatively cacheable.
+
+        The TTL doubles for every consecutive failure of the same key, capped at negative_max_ttl_s;
+        the streak resets once the key succeeds or stays quiet for a full max TTL.
+        """
+        base = self._negative_ttls.get(error.code)
+        if not base:
+            return None
+        now = time.time()
+        prev = self._negative.get(key)
+        failures = prev.failures + 1 if prev and now - prev.expires_at < self._negative_max_ttl_s else 1
+        ttl = min(self._negative_max_ttl_s, base * (2 ** (failures - 1)))
+        entry = NegativeEntry(error=error, expires_at=now + ttl, failures=failures)
+        self._negative[key] = entry
+        if len(self._negative) > 1024:
+            # Drop records whose failure streak can no longer continue.
+            self._negative = {k: e for k, e in self._negative.items() if now - e.expires_at < self._negative_max_ttl_s}
+        return entry
+
+    def _raise_negative(self, entry: NegativeEntry) -> None:
+        self.negative_hits += 1
+        err = entry.error
+        details = {**(err.details or {}), "negative_cache": True, "retry_after_s": max(0, int(entry.expires_at - time.time()))}
+        raise type(err)(code=err.code, message=err.message, details=details, cause=err.cause)
 
     async def get_or_set(
         self,
         key: str,
         factory: Callable[[], "Any"],
-        ttl_s: Optional[int] = None,
+        ttl_s: Optional[Union[int, Callable[[Any], int]]] = None,
     ):
+        """Return the cached value or compute it once; `ttl_s` may be a function of the fetched value."""
         entry = self.get(key)
         if entry:
-            return entry.value, {"hit": True, "age_s": int(time.time() - entry.created_at), "ttl_s": int(entry.expires_at - entry.created_at)}
-        created = False
-        async with self._inflight_lock:
-            task = self._inflight.get(key)
-            if task is None:
-                task = asyncio.create_task(factory())
-                self._inflight[key] = task
-                created = True
-        try:
-            value = await task
-        except Exception:
-            if created:
-                async with self._inflight_lock:
-                    if self._inflight.get(key) is task:
-                        self._inflight.pop(key, None)
-            raise
-
-        if created:
-            self.set(key, value, ttl_s=ttl_s)
-            async with self._inflight_lock:
-                if self._inflight.get(key) is task:
-                    self._inflight.pop(key, None)
-            return value, {"hit": False, "age_s": 0, "ttl_s": ttl_s if ttl_s is not None else self._default_ttl_s}
+            self._record_hit(key, entry)
+            return self.value_of(key, entry), {"hit": True, "age_s": int(time.time() - entry.created_at), "ttl_s": int(entry.expires_at - entry.created_at)}
+        negative = self.get_negative(key)
+        if negative is not None:
+            self._raise_negative(negative)
+
+        async def fill() -> tuple[Any, int]:
+            # Runs as its own task: it fills the cache even if every caller has been cancelled.
+            self._families.setdefault(_family(key), FamilyStats()).misses += 1
+            try:
+                value = await factory()
+            except AppError as e:
+                self.set_negative(key, e)
+                raise
+            ttl = ttl_s(value) if callable(ttl_s) else ttl_s if ttl_s is not None else self._default_ttl_s
+            self.set(key, value, ttl_s=ttl)
+            self._negative.pop(key, None)
+            return value, ttl
+
+        (value, ttl), shared = await self._flights.do(key, fill)
+        if not shared:
+            return value, {"hit": False, "age_s": 0, "ttl_s": ttl}
 
         entry = self.get(key)
         if entry:
-            return entry.value, {"hit": True, "age_s": int(time.time() - entry.created_at), "ttl_s": int(entry.expires_at - entry.created_at)}
-        return value, {"hit": False, "age_s": 0, "ttl_s": ttl_s if ttl_s is not None else self._default_ttl_s}
+            self._record_hit(key, entry)
+            return self.value_of(key, entry), {"hit": True, "age_s": int(time.time() - entry.created_at), "ttl_s": int(entry.expires_at - entry.created_at)}
+        return value, {"hit": False, "age_s": 0, "ttl_s": ttl}
+
+    def stats(self, top_k: int = 10) -> dict[str, Any]:
+        """Per-family counts, estimated bytes, hit ratios and age histograms plus the hottest keys.
+
+        Built from counters maintained on every write and hit, so the cost is independent of
+        the number of stored entries.
+        """
+        now_minute = int(time.time() // 60)
+        families: dict[str, Any] = {}
+        for name, fam in sorted(self._families.items()):
+            histogram = dict.fromkeys(_AGE_LABELS, 0)
+            for minute, count in fam.created_minutes.items():
+                age_s = (now_minute - minute) * 60
+                label = next((l for l, b in zip(_AGE_LABELS, _AGE_BUCKETS_S) if age_s < b), _AGE_LABELS[-1])
+                histogram[label] += count
+            lookups = fam.hits + fam.misses
+            families[name] = {
+                "entries": fam.entries,
+                "bytes_estimate": fam.bytes,
+                "hits": fam.hits,
+                "misses": fam.misses,
+                "hit_ratio": round(fam.hits / lookups, 4) if lookups else None,
+                "age_histogram": histogram,
+            }
+        top = sorted(self._hot_keys.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+        return {
+            "entries": len(self._store),
+            "bytes_estimate": sum(f.bytes for f in self._families.values()),
+            "inflight": len(self._flights),
+            "singleflight": self._flights.snapshot(),
+            "families": families,
+            "top_keys": [{"key": k, "hits": h} for k, h in top],
+            "negative": {"entries": len(self._negative), "hits": self.negative_hits},
+            "shared_busy": self._shared.busy if self._shared is not None else 0,
+        }
@@ -28,3 +28,7 @@ class ValidationError(AppError):
 
 class RateLimitError(AppError):
     pass
+
+
+class OverloadedError(AppError):
+    pass
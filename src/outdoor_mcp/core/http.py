@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Optional
+import importlib.util
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
 
 import httpx
 
@@ -11,13 +17,99 @@ from .logging import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+
+@dataclass
+class ValidatedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: Any
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
 
 class HttpClient:
+    """Retrying HTTP client with one connection pool per provider.
+
+    Pools are sized from http_max_connections / http_max_keepalive_connections /
+    http_keepalive_expiry_s, overridable per provider via http_provider_pools. HTTP/2 is used
+    when http_http2 is set and the optional `h2` package is installed.
+    """
+
     def __init__(self):
-        self._client = httpx.AsyncClient(timeout=settings.http_timeout_s)
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._last_used: dict[str, float] = {}
+        self._warm_task: Optional[asyncio.Task] = None
+        self._http2 = settings.http_http2 and _http2_available()
+        if settings.http_http2 and not self._http2:
+            logger.warning("http2_unavailable", hint="install httpx[http2] to enable HTTP/2")
+        # Parsed values of responses that carried ETag/Last-Modified, kept for conditional refreshes.
+        self._validated: OrderedDict[str, ValidatedResponse] = OrderedDict()
+        self.revalidated = 0
+        # Called with the provider name before every retried attempt; may raise to stop retrying.
+        self.on_retry: Optional[Callable[[str], None]] = None
+
+    def _client(self, provider: str) -> httpx.AsyncClient:
+        client = self._clients.get(provider)
+        if client is None:
+            pool = settings.http_provider_pools.get(provider, {})
+            limits = httpx.Limits(
+                max_connections=int(pool.get("max_connections", settings.http_max_connections)),
+                max_keepalive_connections=int(pool.get("max_keepalive_connections", settings.http_max_keepalive_connections)),
+                keepalive_expiry=float(pool.get("keepalive_expiry_s", settings.http_keepalive_expiry_s)),
+            )
+            client = self._clients[provider] = httpx.AsyncClient(timeout=settings.http_timeout_s, limits=limits, http2=self._http2)
+        return client
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            try:
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+            self._warm_task = None
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def warm(self, targets: dict[str, list[str]], idle_s: float = 0.0) -> None:
+        """Open (or refresh) pooled connections to each target's origin.
+
+        A HEAD to the origin root pays DNS/TCP/TLS setup outside user requests; providers that
+        served real traffic within `idle_s` already have live connections and are skipped.
+        """
+        now = time.monotonic()
+        calls = []
+        for provider, urls in targets.items():
+            if idle_s and now - self._last_used.get(provider, float("-inf")) < idle_s:
+                continue
+            client = self._client(provider)
+            for url in dict.fromkeys(f"{u.scheme}://{u.netloc}/" for u in map(urlsplit, urls)):
+                calls.append(self._warm_one(client, provider, url))
+        await asyncio.gather(*calls)
+
+    @staticmethod
+    async def _warm_one(client: httpx.AsyncClient, provider: str, url: str) -> None:
+        try:
+            await client.head(url, timeout=settings.http_timeout_s)
+        except httpx.HTTPError as e:
+            logger.debug("http_warm_failed", provider=provider, url=url, error=str(e))
+
+    def start_warming(self, targets: dict[str, list[str]], interval_s: float) -> None:
+        """Warm pools now and, when interval_s > 0, re-warm idle ones before keepalive expires."""
+
+        async def loop() -> None:
+            await self.warm(targets)
+            while interval_s > 0:
+                await asyncio.sleep(interval_s)
+                await self.warm(targets, idle_s=interval_s)
+
+        if self._warm_task is None and targets:
+            self._warm_task = asyncio.create_task(loop())
 
     def _retry_delay(self, attempt: int) -> float:
         base = settings.http_retry_backoff_s * (2 ** attempt)
@@ -33,11 +125,16 @@ class HttpClient:
         data: Optional[dict[str, Any]] = None,
         headers: Optional[dict[str, str]] = None,
         timeout: Optional[float] = None,
+        provider: str = "default",
     ) -> httpx.Response:
+        client = self._client(provider)
+        self._last_used[provider] = time.monotonic()
         last_exc: Exception | None = None
         for attempt in range(settings.http_max_retries + 1):
+            if attempt and self.on_retry is not None:
+                self.on_retry(provider)
             try:
-                resp = await self._client.request(
+                resp = await client.request(
                     method,
                     url,
                     params=params,
@@ -58,3 +155,51 @@ class HttpClient:
                 last_exc = e
                 await asyncio.sleep(self._retry_delay(attempt))
         raise ProviderError(code="network_error", message="Network error while calling external provider.", details={"url": url}, cause=last_exc)
+
+    @staticmethod
+    def _validator_key(method: str, url: str, params: Optional[dict[str, Any]], data: Optional[dict[str, Any]]) -> str:
+        return json.dumps([method.upper(), url, params or {}, data or {}], sort_keys=True, default=str)
+
+    async def request_cached(
+        self,
+        method: str,
+        url: str,
+        *,
+        parse: Callable[[httpx.Response], T],
+        params: Optional[dict[str, Any]] = None,
+        data: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        provider: str = "default",
+    ) -> T:
+        """Send a conditional request when validators are known and reuse the parsed value on 304.
+
+        `parse` turns a fresh response into the value to return (raising on error statuses);
+        it is skipped entirely when the upstream answers 304 Not Modified.
+        """
+        key = self._validator_key(method, url, params, data)
+        stored = self._validated.get(key)
+        req_headers = dict(headers or {})
+        if stored is not None:
+            if stored.etag:
+                req_headers["If-None-Match"] = stored.etag
+            if stored.last_modified:
+                req_headers["If-Modified-Since"] = stored.last_modified
+
+        resp = await self.request(method, url, params=params, data=data, headers=req_headers or None, timeout=timeout, provider=provider)
+        if resp.status_code == 304 and stored is not None:
+            self.revalidated += 1
+            self._validated.move_to_end(key)
+            return stored.value
+
+        value = parse(resp)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status_code == 200 and (etag or last_modified):
+            self._validated[key] = ValidatedResponse(etag=etag, last_modified=last_modified, value=value)
+            self._validated.move_to_end(key)
+            while len(self._validated) > settings.http_validator_cache_size:
+                self._validated.popitem(last=False)
+        else:
+            self._validated.pop(key, None)
+        return value
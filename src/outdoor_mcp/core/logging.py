@@ -1,35 +1,200 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
+from typing import Any, Callable, Optional, TextIO
+
 import structlog
 
 from .settings import settings
 
 
+class EventSampler:
+    """structlog processor that samples and rate-caps noisy events by event name.
+
+    `sample_rates` keeps roughly that fraction of an event (0.1 keeps one in ten); `rate_limits`
+    caps an event at that many lines per second. Dropped lines are counted, not queued.
+    """
+
+    def __init__(self, sample_rates: dict[str, float], rate_limits: dict[str, float]):
+        self._sample_rates = sample_rates
+        self._rate_limits = rate_limits
+        self._windows: dict[str, list[float]] = {}
+        self.dropped = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+        event = event_dict.get("event")
+        rate = self._sample_rates.get(event)  # type: ignore[arg-type]
+        if rate is not None and random.random() >= rate:
+            self.dropped += 1
+            raise structlog.DropEvent
+        cap = self._rate_limits.get(event)  # type: ignore[arg-type]
+        if cap is not None:
+            second = int(time.monotonic())
+            window = self._windows.setdefault(event, [second, 0])  # type: ignore[arg-type]
+            if window[0] != second:
+                window[0], window[1] = second, 0
+            if window[1] >= cap:
+                self.dropped += 1
+                raise structlog.DropEvent
+            window[1] += 1
+        return event_dict
+
+
+def _to_queue(logger: Any, method_name: str, event_dict: dict[str, Any]) -> tuple[tuple[Any, ...], dict[str, Any]]:
+    # Last processor: hand the unrendered event dict to QueueLogger as a single argument.
+    return (event_dict,), {}
+
+
+class QueueLogger:
+    """structlog logger that enqueues event dicts and never blocks; overflow is counted."""
+
+    def __init__(self, pipeline: "LogPipeline"):
+        self._pipeline = pipeline
+
+    def msg(self, event_dict: dict[str, Any]) -> None:
+        self._pipeline.put(event_dict)
+
+    log = debug = info = warning = warn = error = critical = exception = fatal = msg
+
+
+class LogPipeline:
+    """Renders and writes log lines on a background thread, in batches."""
+
+    def __init__(self, renderer: Callable[..., Any], stream: TextIO, max_queue: int = 10000, batch_size: int = 256):
+        # structlog renderers are typed as returning str | bytes | ...; _render coerces to str.
+        self.renderer: Callable[..., Any] = renderer
+        self._stream = stream
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._stop = threading.Event()
+        self.dropped = 0
+        self.written = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, event_dict: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event_dict)
+        except queue.Full:
+            self.dropped += 1
+
+    def _render(self, event_dict: dict[str, Any]) -> str:
+        try:
+            return str(self.renderer(None, event_dict.get("level", "info"), event_dict))
+        except Exception as e:
+            return f"log_render_failed event={event_dict.get('event')!r} error={e!r}"
+
+    def _drain(self, first: dict[str, Any]) -> None:
+        batch = [first]
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        lines = [self._render(ed) for ed in batch]
+        try:
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+        except (OSError, ValueError):
+            return
+        self.written += len(batch)
+
+    def _report_drops(self, reported: int) -> int:
+        # Surface overflow in the log itself, once per batch at most.
+        dropped = self.dropped
+        if dropped > reported:
+            self._drain({"event": "log_lines_dropped", "level": "warning", "count": dropped - reported, "total": dropped})
+        return dropped
+
+    def _run(self) -> None:
+        reported = 0
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                first = None
+            reported = self._report_drops(reported)
+            if first is not None:
+                self._drain(first)
+        self._report_drops(reported)
+
+    def close(self, timeout_s: float = 2.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout_s)
+
+    def stats(self) -> dict[str, int]:
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+
+_pipeline: Optional[LogPipeline] = None
+_sampler: Optional[EventSampler] = None
+
+
+def _reset_after_fork() -> None:
+    # The writer thread does not survive fork; the child builds its own on configure_logging().
+    global _pipeline
+    _pipeline = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _close_pipeline() -> None:
+    if _pipeline is not None:
+        _pipeline.close()
+
+
+atexit.register(_close_pipeline)
+
+
 def configure_logging() -> None:
+    global _pipeline, _sampler
     level = getattr(logging, settings.log_level.upper(), logging.INFO)
     logging.basicConfig(level=level, stream=sys.stderr, format="%(message)s")
 
-    processors = [
+    _sampler = EventSampler(settings.log_sample_rates, settings.log_rate_limits)
+    processors: list[Any] = [
+        _sampler,
         structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
     ]
+    renderer: Callable[..., Any] = structlog.processors.JSONRenderer() if settings.log_json else structlog.dev.ConsoleRenderer()
 
-    if settings.log_json:
-        processors.append(structlog.processors.JSONRenderer())
+    if settings.log_async:
+        if _pipeline is None:
+            _pipeline = LogPipeline(renderer, sys.stderr, max_queue=settings.log_queue_size, batch_size=settings.log_batch_size)
+        else:
+            _pipeline.renderer = renderer
+        processors.append(_to_queue)
+        pipeline = _pipeline
+        logger_factory: Any = lambda *args: QueueLogger(pipeline)
     else:
-        processors.append(structlog.dev.ConsoleRenderer())
+        processors.append(renderer)
+        logger_factory = structlog.PrintLoggerFactory(file=sys.stderr)
 
     structlog.configure(
         processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(level),
-        logger_factory=structlog.PrintLoggerFactory(file=sys.stderr),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
 
+def log_stats() -> dict[str, int]:
+    stats = _pipeline.stats() if _pipeline is not None else {"queued": 0, "written": 0, "dropped": 0}
+    stats["sampled_out"] = _sampler.dropped if _sampler is not None else 0
+    return stats
+
+
 def get_logger(name: str):
     return structlog.get_logger(name)
@@ -4,8 +4,11 @@ import time
 import asyncio
 from dataclasses import dataclass
 
+from typing import Optional
+
 from .exceptions import RateLimitError
 from .settings import settings
+from .shared_state import SharedStateStore
 
 
 @dataclass
@@ -30,16 +33,31 @@ class TokenBucket:
 
 
 class RateLimiter:
-    def __init__(self, rate_per_s: float, capacity: float | None = None):
+    def __init__(
+        self,
+        rate_per_s: float,
+        capacity: float | None = None,
+        *,
+        shared: Optional[SharedStateStore] = None,
+        name: str = "default",
+    ):
         cap = capacity if capacity is not None else max(1.0, rate_per_s)
         self._bucket = TokenBucket(rate_per_s=rate_per_s, capacity=cap, tokens=cap, updated_at=time.time())
         self._lock = asyncio.Lock()
+        # When shared, the bucket lives in the cross-process store so all workers draw from one budget.
+        self._shared = shared
+        self._name = name
+
+    def _consume(self) -> bool:
+        if self._shared is not None:
+            return self._shared.take_token(self._name, self._bucket.rate_per_s, self._bucket.capacity)
+        return self._bucket.consume(1.0)
 
     async def acquire(self) -> None:
         start = time.time()
         while True:
             async with self._lock:
-                if self._bucket.consume(1.0):
+                if self._consume():
                     return
             if time.time() - start > settings.rate_limit_max_wait_s:
                 raise RateLimitError(code="rate_limited", message="Rate limit exceeded. Please retry.")
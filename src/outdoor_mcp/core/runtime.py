@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def install_event_loop(mode: str) -> str:
+    """Select the event loop implementation for `mode` before the loop is created.
+
+    "performance" uses uvloop when it is installed (the `performance` extra) and falls back to
+    the standard asyncio loop otherwise. Returns the name of the implementation in use.
+    """
+    if mode != "performance":
+        return "asyncio"
+    try:
+        import uvloop  # type: ignore[import-not-found]
+    except ImportError:
+        logger.warning("uvloop_unavailable", hint="install outdoor-intelligence-mcp[performance]")
+        return "asyncio"
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopWatchdog:
+    """Measures event-loop scheduling lag and captures what is blocking the loop.
+
+    A task on the loop sleeps `interval_s` and records how late it woke up (the lag). It also
+    stamps a heartbeat that a daemon thread checks; when the heartbeat is older than
+    `threshold_s` the loop is stuck in synchronous code, and the thread grabs the loop thread's
+    current stack so the stall can be attributed.
+    """
+
+    def __init__(self, interval_s: float = 0.1, threshold_s: float = 0.1, max_samples: int = 2048, max_stalls: int = 20):
+        self._interval_s = interval_s
+        self._threshold_s = threshold_s
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._stalls: deque[dict[str, Any]] = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._beat = time.monotonic()
+        self._captured_beat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self._interval_s
+            await asyncio.sleep(self._interval_s)
+            now = time.monotonic()
+            self._samples.append(max(0.0, now - expected))
+            self._beat = now
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self._threshold_s / 2):
+            beat = self._beat
+            stalled_s = time.monotonic() - beat - self._interval_s
+            if stalled_s < self._threshold_s or self._captured_beat == beat:
+                continue
+            # One capture per stall: the heartbeat only moves once the loop runs again.
+            self._captured_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self.stall_count += 1
+            self._stalls.append({"at": time.time(), "stalled_ms": round(stalled_s * 1000, 1), "stack": stack})
+            logger.warning("event_loop_blocked", stalled_ms=round(stalled_s * 1000, 1), stack=stack[-2000:])
+
+    def snapshot(self, include_stacks: bool = False) -> dict[str, Any]:
+        ordered = sorted(self._samples)
+        lag: dict[str, Any] = {"samples": len(ordered)}
+        if ordered:
+            lag.update(
+                p50_ms=round(_percentile(ordered, 0.5) * 1000, 2),
+                p90_ms=round(_percentile(ordered, 0.9) * 1000, 2),
+                p99_ms=round(_percentile(ordered, 0.99) * 1000, 2),
+                max_ms=round(ordered[-1] * 1000, 2),
+            )
+        stalls = [s if include_stacks else {k: v for k, v in s.items() if k != "stack"} for s in self._stalls]
+        return {"lag": lag, "threshold_ms": self._threshold_s * 1000, "stall_count": self.stall_count, "recent_stalls": stalls}
@@ -9,6 +9,11 @@ class Settings(BaseSettings):
 
     server_name: str = Field(default="Outdoor Intelligence")
     overpass_url: str = Field(default="https://overpass-api.de/api/interpreter")
+    # Optional list of Overpass mirrors; when set it replaces overpass_url.
+    overpass_urls: list[str] = Field(default_factory=list)
+    overpass_hedge: bool = Field(default=True)
+    overpass_hedge_min_delay_s: float = Field(default=0.5)
+    overpass_mirror_cooldown_s: float = Field(default=30.0)
     openweather_api_key: str = Field(default="")
     openweather_base_url: str = Field(default="https://api.openweathermap.org/data/2.5")
     nps_api_key: str = Field(default="")
@@ -18,21 +23,138 @@ class Settings(BaseSettings):
     http_max_retries: int = Field(default=2)
     http_retry_backoff_s: float = Field(default=0.2)
     http_retry_max_backoff_s: float = Field(default=2.0)
+    # Connection pool per provider; http_provider_pools overrides these per provider name, e.g.
+    # {"osm_overpass": {"max_connections": 4, "keepalive_expiry_s": 120}}. HTTP/2 needs httpx[http2].
+    http_max_connections: int = Field(default=20, ge=1)
+    http_max_keepalive_connections: int = Field(default=10, ge=0)
+    http_keepalive_expiry_s: float = Field(default=60.0, ge=0)
+    http_provider_pools: dict[str, dict[str, float]] = Field(default_factory=dict)
+    http_http2: bool = Field(default=False)
+    # Open connections to provider hosts at startup and re-warm idle pools every interval (0 disables).
+    http_warm_on_start: bool = Field(default=True)
+    http_warm_interval_s: float = Field(default=45.0, ge=0)
+    # Max responses whose ETag/Last-Modified validators (and parsed values) are kept for revalidation.
+    http_validator_cache_size: int = Field(default=512)
 
     cache_ttl_s: int = Field(default=600)
+    # Per data type TTLs: OSM data changes over weeks; weather expires at the next expected
+    # observation (observation time + interval), clamped to [min, max].
+    cache_ttl_osm_s: int = Field(default=21600, ge=0)
+    cache_ttl_alerts_s: int = Field(default=300, ge=0)
+    cache_ttl_weather_interval_s: int = Field(default=600, ge=0)
+    cache_ttl_weather_min_s: int = Field(default=60, ge=0)
+    cache_ttl_weather_max_s: int = Field(default=900, ge=0)
+    # Cached values whose pickled size reaches this many bytes are stored zlib-compressed (0 disables);
+    # the cache_hot_set_size most recently read ones are also kept decoded.
+    cache_compress_min_bytes: int = Field(default=4096, ge=0)
+    cache_compress_level: int = Field(default=6, ge=1, le=9)
+    cache_hot_set_size: int = Field(default=128, ge=0)
+    # Base TTL (seconds) of negative cache entries per error code; doubles per consecutive failure.
+    negative_cache_ttls: dict[str, float] = Field(
+        default_factory=lambda: {
+            "overpass_http_error": 15.0,
+            "openweather_http_error": 15.0,
+            "nps_http_error": 30.0,
+            "nps_no_parks": 120.0,
+            "network_error": 5.0,
+            "quota_exhausted": 60.0,
+        }
+    )
+    negative_cache_max_ttl_s: float = Field(default=300.0)
     rate_limit_rps: float = Field(default=3)
     rate_limit_max_wait_s: float = Field(default=5.0)
 
+    # Transport and pre-fork workers. Multiple workers need a networked transport and share
+    # cache entries and rate-limit tokens through the SQLite file at shared_state_path.
+    transport: str = Field(default="stdio")
+    http_host: str = Field(default="127.0.0.1")
+    http_port: int = Field(default=8000)
+    workers: int = Field(default=1, ge=1)
+    shared_state_path: str = Field(default="")
+    # The store is used from the event loop: lock waits are capped at this, and a busy store
+    # is treated as a cache miss instead of stalling requests. Expired rows are purged every
+    # shared_state_purge_interval_s.
+    shared_state_busy_timeout_ms: int = Field(default=50, ge=0)
+    shared_state_purge_interval_s: float = Field(default=300.0, gt=0)
+    # Live entries copied from the shared store into memory at startup (e.g. written by the
+    # outdoor-intelligence-precompute CLI); 0 disables.
+    cache_preload_max_entries: int = Field(default=5000, ge=0)
+
+    # Upstream quota budgets per provider name, e.g. {"openweather": {"limit": 1000, "window_s": 86400}}.
+    # Below budget_low_watermark (fraction remaining) TTLs stretch, stale entries are served and
+    # background pre-warming is refused.
+    budget_limits: dict[str, dict[str, float]] = Field(default_factory=dict)
+    budget_state_path: str = Field(default="")
+    budget_low_watermark: float = Field(default=0.2, ge=0, le=1)
+    budget_low_ttl_multiplier: float = Field(default=4.0, ge=1)
+    # Expired entries stay available as stale fallbacks for this long.
+    cache_stale_grace_s: int = Field(default=3600, ge=0)
+
+    # Admission control for cache-missing tool calls (hits and joins of in-flight fetches bypass it).
+    admission_max_concurrency: int = Field(default=32, ge=1)
+    admission_tool_max_concurrency: int = Field(default=16, ge=1)
+    admission_tool_limits: dict[str, int] = Field(default_factory=dict)
+    admission_max_queue: int = Field(default=64, ge=0)
+    admission_max_wait_s: float = Field(default=2.0)
+
+    # "performance" installs uvloop when available and enables the event-loop lag watchdog.
+    runtime_mode: str = Field(default="standard")
+    loop_watchdog: bool = Field(default=False)
+    loop_watchdog_interval_s: float = Field(default=0.1, gt=0)
+    # Loop stalls longer than this capture the blocking stack (reported by the diagnostics tool).
+    loop_watchdog_threshold_s: float = Field(default=0.1, gt=0)
+
     log_level: str = Field(default="INFO")
     log_json: bool = Field(default=False)
+    # Log lines are rendered and written in batches by a background thread; when the queue is
+    # full lines are dropped (and counted) instead of blocking.
+    log_async: bool = Field(default=True)
+    log_queue_size: int = Field(default=10000, ge=1)
+    log_batch_size: int = Field(default=256, ge=1)
+    # Per event name: fraction of lines kept, and max lines per second.
+    log_sample_rates: dict[str, float] = Field(default_factory=dict)
+    log_rate_limits: dict[str, float] = Field(default_factory=dict)
 
     overpass_timeout_s: float = Field(default=20.0)
+    # Locations returned by search_locations, kept so location_id resolves to the real entity;
+    # persisted in the shared store when shared_state_path is set (so all workers see the same
+    # ids), else as JSON at location_registry_path.
+    location_registry_size: int = Field(default=10000, ge=0)
+    location_registry_path: str = Field(default="")
+
+    # Results fetched once per search area/query and paged from cache via cursors.
+    search_result_set_size: int = Field(default=100, ge=25)
+    # Overpass searches fetch limit * factor candidates (at most search_overfetch_max) and keep
+    # the nearest, most relevant ones.
+    search_overfetch_factor: int = Field(default=4, ge=1)
+    search_overfetch_max: int = Field(default=500, ge=1)
     openweather_timeout_s: float = Field(default=12.0)
     nps_timeout_s: float = Field(default=12.0)
     nps_parks_page_size: int = Field(default=50)
     nps_parks_max_pages: int = Field(default=6)
+    # The parks catalog barely changes; it is fetched whole and cached this long.
+    nps_parks_ttl_s: int = Field(default=7 * 86400, ge=60)
     nps_alerts_limit: int = Field(default=20)
 
+    # Offline OSM extracts (Overpass JSON dumps); Overpass is used outside their extents.
+    osm_extract_paths: list[str] = Field(default_factory=list)
+    osm_extract_cell_deg: float = Field(default=0.05, gt=0)
+
+    # Overpass queries submitted within this window are merged into one POST (0 disables).
+    # A merged query gets the per-query server timeout times its size, so batches are also
+    # capped at overpass_batch_max_timeout_s of combined server time.
+    overpass_batch_window_ms: float = Field(default=20.0, ge=0)
+    overpass_batch_max: int = Field(default=8, ge=1)
+    overpass_batch_max_timeout_s: int = Field(default=100, ge=1)
+
+    # Local name index: text searches within name_index_max_radius_km fetch all named elements
+    # of a name_index_area_km area once and answer later queries there from memory.
+    name_index_max_radius_km: float = Field(default=10.0)
+    name_index_area_km: float = Field(default=5.0)
+    name_index_fetch_limit: int = Field(default=5000)
+    name_index_ttl_s: int = Field(default=3600)
+    name_index_max_elements: int = Field(default=200000)
+
     # Demo mode: if no API keys available, tools still return deterministic synthetic outputs.
     demo_fallback: bool = Field(default=True)
 
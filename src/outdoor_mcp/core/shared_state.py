@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires_at REAL NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)",
+    """
+    CREATE TABLE IF NOT EXISTS buckets (
+        name TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS budgets (
+        name TEXT PRIMARY KEY,
+        used INTEGER NOT NULL,
+        window_start REAL NOT NULL,
+        window_s REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS locations (
+        id TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS locations_updated_at ON locations (updated_at)",
+    """
+    CREATE TABLE IF NOT EXISTS precompute_progress (
+        job TEXT NOT NULL,
+        task TEXT NOT NULL,
+        status TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (job, task)
+    )
+    """,
+)
+
+
+class SharedStateStore:
+    """SQLite-backed cache entries, token buckets and quota windows shared by all worker processes on one host.
+
+    Each process opens its own connection (after fork); WAL mode lets readers proceed while
+    another worker writes, and token and quota consumption run in IMMEDIATE transactions so
+    buckets and budget windows are debited atomically across processes.
+
+    Calls are made from the event loop, so the busy timeout should stay short. No method raises
+    on a locked database: reads return nothing, writes are skipped and a token request reports
+    no token (all counted in `busy`), and callers degrade instead of stalling or failing. Expired cache rows are purged at most
+    every purge_interval_s, piggybacking on cache writes.
+    """
+
+    def __init__(self, path: str, busy_timeout_s: float = 2.0, purge_interval_s: float = 300.0):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_s, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._purge_interval_s = purge_interval_s
+        self._next_purge = 0.0
+        self.busy = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for stmt in _SCHEMA:
+                self._conn.execute(stmt)
+        self._maybe_purge()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _busy(self, op: str, e: sqlite3.OperationalError) -> None:
+        self.busy += 1
+        logger.debug("shared_state_busy", op=op, error=str(e))
+
+    def cache_get(self, key: str) -> Optional[tuple[bytes, float, float]]:
+        """(pickled value, expires_at, created_at) of a live entry; decoding is left to the caller."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at, created_at FROM cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+        except sqlite3.OperationalError as e:
+            self._busy("cache_get", e)
+            return None
+        if row is None:
+            return None
+        return bytes(row[0]), float(row[1]), float(row[2])
+
+    def cache_set(self, key: str, value: Any, expires_at: float, created_at: float, blob: Optional[bytes] = None) -> None:
+        if blob is None:
+            try:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.warning("shared_cache_encode_failed", key=key, error=str(e))
+                return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                    (key, blob, expires_at, created_at),
+                )
+        except sqlite3.OperationalError as e:
+            self._busy("cache_set", e)
+            return
+        self._maybe_purge()
+
+    def cache_items(self, limit: int) -> list[tuple[str, bytes, float, float]]:
+        """Most recently written live entries (pickled), for warming a process-local cache at startup."""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, value, expires_at, created_at FROM cache WHERE expires_at > ? ORDER BY created_at DESC LIMIT ?",
+                    (time.time(), limit),
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            self._busy("cache_items", e)
+            return []
+        return [(key, bytes(blob), float(expires_at), float(created_at)) for key, blob, expires_at, created_at in rows]
+
+    def location_get(self, location_id: str) -> Optional[str]:
+        """JSON of a registered location, or None (also when the store is busy)."""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT data FROM locations WHERE id = ?", (location_id,)).fetchone()
+        except sqlite3.OperationalError as e:
+            self._busy("location_get", e)
+            return None
+        return None if row is None else str(row[0])
+
+    def locations_put(self, rows: list[tuple[str, str]], keep: int) -> bool:
+        """Upsert (id, json) rows, then trim the table to the `keep` most recently written ids.
+
+        Returns False when the store was busy and nothing was written.
+        """
+        now = time.time()
+        try:
+            with self._immediate():
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO locations (id, data, updated_at) VALUES (?, ?, ?)",
+                    [(location_id, data, now) for location_id, data in rows],
+                )
+                self._conn.execute(
+                    "DELETE FROM locations WHERE updated_at < "
+                    "(SELECT updated_at FROM locations ORDER BY updated_at DESC LIMIT 1 OFFSET ?)",
+                    (max(0, keep - 1),),
+                )
+        except sqlite3.OperationalError as e:
+            self._busy("locations_put", e)
+            return False
+        return True
+
+    def progress_done(self, job: str) -> set[str]:
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT task FROM precompute_progress WHERE job = ? AND status = 'done'", (job,)
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            # Nothing is skipped then; finished tasks are replayed (mostly as cache hits).
+            self._busy("progress_done", e)
+            return set()
+        return {r[0] for r in rows}
+
+    def progress_mark(self, job: str, task: str, status: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO precompute_progress (job, task, status, updated_at) VALUES (?, ?, ?, ?)",
+                    (job, task, status, time.time()),
+                )
+        except sqlite3.OperationalError as e:
+            # The task just runs again on the next resume.
+            self._busy("progress_mark", e)
+
+    def purge_expired(self) -> int:
+        try:
+            with self._lock:
+                cur = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.OperationalError as e:
+            self._busy("purge_expired", e)
+            return 0
+        return cur.rowcount
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self._purge_interval_s
+        purged = self.purge_expired()
+        if purged:
+            logger.debug("shared_cache_purged", rows=purged)
+
+    @contextmanager
+    def _immediate(self) -> Iterator[None]:
+        # One IMMEDIATE write transaction; raises OperationalError if the store stays locked.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def take_token(self, bucket: str, rate_per_s: float, capacity: float, amount: float = 1.0) -> bool:
+        try:
+            with self._immediate():
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (bucket,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate_per_s)
+                granted = tokens >= amount
+                if granted:
+                    tokens -= amount
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (bucket, tokens, now),
+                )
+        except sqlite3.OperationalError as e:
+            # Another worker holds the write lock; the caller retries like any refused token.
+            self._busy("take_token", e)
+            return False
+        return granted
+
+    def budget_get(self, name: str) -> Optional[tuple[int, float, float]]:
+        """(used, window_start, window_s) of a quota window; None if never debited or the store is busy."""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT used, window_start, window_s FROM budgets WHERE name = ?", (name,)).fetchone()
+        except sqlite3.OperationalError as e:
+            self._busy("budget_get", e)
+            return None
+        return None if row is None else (int(row[0]), float(row[1]), float(row[2]))
+
+    def budget_spend(self, name: str, limit: int, window_s: float, reserve: float = 1.0) -> Optional[tuple[bool, int, float]]:
+        """Debit one call if at least `reserve` calls remain; returns (granted, used, window_start).
+
+        Returns None when the store is busy and nothing was debited.
+        """
+        try:
+            with self._immediate():
+                now = time.time()
+                row = self._conn.execute("SELECT used, window_start, window_s FROM budgets WHERE name = ?", (name,)).fetchone()
+                if row is None or float(row[2]) != window_s or now - float(row[1]) >= window_s:
+                    used, window_start = 0, now
+                else:
+                    used, window_start = int(row[0]), float(row[1])
+                granted = limit - used >= reserve
+                if granted:
+                    used += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO budgets (name, used, window_start, window_s) VALUES (?, ?, ?, ?)",
+                    (name, used, window_start, window_s),
+                )
+        except sqlite3.OperationalError as e:
+            self._busy("budget_spend", e)
+            return None
+        return granted, used, window_start
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: "asyncio.Task[T]"
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers for the key share its result.
+
+    Coordination is per key and lock-free: the lookup-or-start step has no await, so it is
+    atomic on the event loop. The call runs as its own task and callers await it through
+    `asyncio.shield`, so a cancelled caller (even the one that started it) neither cancels the
+    call nor leaves the other waiters with a broken result.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight[Any]] = {}
+        self.started = 0
+        self.joined = 0
+        self.max_waiters = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    def _done(self, key: str, flight: _Flight[Any], task: "asyncio.Task[Any]") -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the outcome as observed even if every waiter was cancelled before it finished.
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Return (result, shared); `shared` is True when the result came from another caller's call."""
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(functools.partial(self._done, key, flight))
+            self.started += 1
+        else:
+            self.joined += 1
+        flight.waiters += 1
+        self.max_waiters = max(self.max_waiters, flight.waiters)
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+
+    def snapshot(self) -> dict[str, Any]:
+        calls = self.started + self.joined
+        return {
+            "inflight": len(self._flights),
+            "waiters": sum(f.waiters for f in self._flights.values()),
+            "max_waiters": self.max_waiters,
+            "started": self.started,
+            "joined": self.joined,
+            "dedup_ratio": round(self.joined / calls, 3) if calls else 0.0,
+        }
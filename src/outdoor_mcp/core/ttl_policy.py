@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import datetime as _dt
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ..models.conditions import RealTimeConditions, WeatherConditions
+
+
+def _parse_iso(value: str) -> Optional[float]:
+    try:
+        parsed = _dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=_dt.timezone.utc)
+    return parsed.timestamp()
+
+
+class TTLPolicy:
+    """Expiry per data type instead of one TTL for everything.
+
+    OSM-derived data (searches, profiles, feature counts) changes over weeks and is kept for
+    hours. Weather expires when the provider is expected to publish its next observation,
+    based on the observation timestamp; alerts use a short fixed TTL.
+    """
+
+    def __init__(
+        self,
+        *,
+        osm_ttl_s: int = 21600,
+        alerts_ttl_s: int = 300,
+        weather_interval_s: int = 600,
+        weather_min_ttl_s: int = 60,
+        weather_max_ttl_s: int = 900,
+    ):
+        self.osm_ttl_s = osm_ttl_s
+        self.alerts_ttl_s = alerts_ttl_s
+        self._weather_interval_s = weather_interval_s
+        self._weather_min_ttl_s = weather_min_ttl_s
+        self._weather_max_ttl_s = weather_max_ttl_s
+
+    def weather(self, weather: WeatherConditions, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        observed = _parse_iso(weather.observed_at_iso)
+        if observed is None:
+            return self._weather_min_ttl_s
+        # Once the next observation is overdue, recheck at the minimum TTL rather than caching longer.
+        until_next = observed + self._weather_interval_s - now
+        return int(max(self._weather_min_ttl_s, min(self._weather_max_ttl_s, until_next)))
+
+    def conditions(self, conditions: RealTimeConditions, now: Optional[float] = None) -> int:
+        return min(self.weather(conditions.weather, now), self.alerts_ttl_s)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import socket
+from typing import Callable
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def bind_listen_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(target: Callable[[socket.socket], None], sock: socket.socket) -> None:
+    # Forked children inherit the parent's supervisor handlers, which only work in the parent.
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL if sig == signal.SIGTERM else signal.default_int_handler)
+    target(sock)
+
+
+def serve_prefork(workers: int, host: str, port: int, target: Callable[[socket.socket], None]) -> None:
+    """Bind once in the parent, then fork `workers` processes that accept on the same socket."""
+    sock = bind_listen_socket(host, port)
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_run_worker, args=(target, sock), name=f"outdoor-mcp-worker-{i}") for i in range(workers)]
+
+    def _stop(signum, _frame):
+        logger.info("workers_stopping", signal=signum)
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+
+    previous = {sig: signal.signal(sig, _stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for p in procs:
+            p.start()
+        logger.info("workers_started", workers=workers, host=host, port=port, pids=[p.pid for p in procs])
+        for p in procs:
+            p.join()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        sock.close()
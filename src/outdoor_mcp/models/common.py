@@ -20,6 +20,7 @@ class CacheMeta(BaseModel):
     hit: bool
     age_s: int
     ttl_s: int
+    stale: bool = False
 
 
 class ToolResponse(BaseModel):
@@ -19,6 +19,8 @@ class WeatherConditions(BaseModel):
 
 
 class Alert(BaseModel):
+    id: Optional[str] = None
+    park_code: Optional[str] = None
     source: str
     title: str
     severity: str = "unknown"
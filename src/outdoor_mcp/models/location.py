@@ -14,6 +14,8 @@ class Location(BaseModel):
     bbox: Optional[dict[str, float]] = None
     confidence: float = Field(default=0.7, ge=0.0, le=1.0)
     source: str = "osm"
+    # Distance from the search origin, set on search results.
+    distance_km: Optional[float] = None
 
 
 class NearbyFeature(BaseModel):
@@ -0,0 +1,251 @@
+"""Fill the persistent cache for known regions before traffic arrives.
+
+The NPS parks catalog is fetched once, then each region is tiled into search cells and every
+location found is profiled. Work goes through the server's own tools, so cache keys, TTLs,
+rate limits and quota budgets are exactly those of live traffic, and results land in the
+shared store that servers pointed at the same SHARED_STATE_PATH preload at startup.
+
+Conditions (weather + NPS alerts) are only fetched with --conditions. Their TTLs are minutes,
+so that prefetch is best-effort: it only helps when the run finishes just before the traffic.
+
+Completed tasks are recorded per job in the store, so an interrupted run resumes where it
+stopped when started again with the same regions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .core.budget import background_priority
+from .core.exceptions import AppError
+from .core.logging import get_logger
+from .core.settings import settings
+from .utils.cursors import fingerprint
+from .utils.geo import EARTH_RADIUS_KM
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Cell:
+    lat: float
+    lon: float
+    radius_km: float
+
+
+def _floats(text: str, n: int, what: str) -> list[float]:
+    parts = [p for p in text.replace(" ", "").split(",") if p]
+    if len(parts) != n:
+        raise argparse.ArgumentTypeError(f"{what} needs {n} comma-separated numbers, got '{text}'")
+    try:
+        return [float(p) for p in parts]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{what} must be numeric, got '{text}'")
+
+
+def cells_for_bbox(south: float, west: float, north: float, east: float, cell_km: float) -> list[Cell]:
+    """Tile a bounding box into search circles of radius cell_km whose union covers it."""
+    # Circles on a square grid of spacing s cover it when r >= s / sqrt(2).
+    spacing_km = cell_km * math.sqrt(2)
+    dlat = math.degrees(spacing_km / EARTH_RADIUS_KM)
+    rows = max(1, math.ceil((north - south) / dlat))
+    cells = []
+    for i in range(rows):
+        lat = south + (i + 0.5) * (north - south) / rows
+        dlon = math.degrees(spacing_km / (EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 1e-6)))
+        cols = max(1, math.ceil((east - west) / dlon))
+        for j in range(cols):
+            lon = west + (j + 0.5) * (east - west) / cols
+            cells.append(Cell(round(lat, 5), round(lon, 5), cell_km))
+    return cells
+
+
+def load_regions(args: argparse.Namespace) -> list[Cell]:
+    cells: list[Cell] = []
+    for bbox in args.bbox:
+        south, west, north, east = _floats(bbox, 4, "--bbox")
+        cells.extend(cells_for_bbox(south, west, north, east, args.cell_km))
+    for point in args.point:
+        values = _floats(point, 3, "--point") if point.count(",") == 2 else _floats(point, 2, "--point") + [args.cell_km]
+        cells.append(Cell(values[0], values[1], values[2]))
+    if args.regions_file:
+        with open(args.regions_file, "r", encoding="utf-8") as f:
+            regions = json.load(f)
+        for region in regions:
+            if "bbox" in region:
+                cells.extend(cells_for_bbox(*map(float, region["bbox"]), args.cell_km))
+            else:
+                cells.append(Cell(float(region["lat"]), float(region["lon"]), float(region.get("radius_km", args.cell_km))))
+    return list(dict.fromkeys(cells))
+
+
+class Precompute:
+    def __init__(
+        self,
+        server: Any,
+        store: Any,
+        job: str,
+        *,
+        concurrency: int,
+        features_radius_km: float,
+        conditions: bool = False,
+    ):
+        self._server = server
+        self._store = store
+        self._job = job
+        self._sem = asyncio.Semaphore(concurrency)
+        self._features_radius_km = features_radius_km
+        self._conditions = conditions
+        self._done = store.progress_done(job)
+        self.counts = {"done": 0, "skipped": 0, "failed": 0, "deferred": 0}
+        self._total = 0
+        self._last_report = 0.0
+
+    async def _call(self, tool: str, args: dict[str, Any]) -> dict[str, Any]:
+        _, out = await self._server.mcp.call_tool(tool, {"args": args})
+        return out
+
+    def _report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_report < 2.0:
+            return
+        self._last_report = now
+        finished = sum(self.counts.values())
+        print(f"[precompute] {finished}/{self._total} tasks " + " ".join(f"{k}={v}" for k, v in self.counts.items()), file=sys.stderr)
+
+    async def _task(self, task: str, tool: str, args: dict[str, Any]) -> Optional[dict[str, Any]]:
+        self._total += 1
+        if task in self._done:
+            self.counts["skipped"] += 1
+            return None
+        async with self._sem:
+            with background_priority():
+                out = await self._call(tool, args)
+        if out.get("ok"):
+            self._store.progress_mark(self._job, task, "done")
+            self.counts["done"] += 1
+        else:
+            code = (out.get("error") or {}).get("code")
+            # Low budgets refuse background work; leave the task pending for the next run.
+            self.counts["deferred" if code == "quota_exhausted" else "failed"] += 1
+            self._store.progress_mark(self._job, task, "failed")
+            logger.warning("precompute_task_failed", task=task, code=code)
+        self._report()
+        return out
+
+    async def _search(self, cell: Cell) -> list[str]:
+        """Page through a cell's search results; returns the location ids found."""
+        ids: list[str] = []
+        args: dict[str, Any] = {"lat": cell.lat, "lon": cell.lon, "radius_km": cell.radius_km, "limit": 25, "detail": "minimal"}
+        while True:
+            async with self._sem:
+                with background_priority():
+                    out = await self._call("search_locations", args)
+            if not out.get("ok"):
+                self.counts["failed"] += 1
+                logger.warning("precompute_search_failed", cell=cell, code=(out.get("error") or {}).get("code"))
+                return ids
+            data = out["data"]
+            ids.extend(l["id"] for l in data["locations"])
+            if not data.get("next_cursor"):
+                return ids
+            args = {**args, "cursor": data["next_cursor"]}
+
+    async def _location(self, location_id: str) -> None:
+        tasks = [
+            self._task(
+                f"profile:{location_id}",
+                "get_location_profile",
+                {"location_id": location_id, "features_radius_km": self._features_radius_km, "detail": "minimal"},
+            )
+        ]
+        if self._conditions:
+            tasks.append(self._task(f"conditions:{location_id}", "get_real_time_conditions", {"location_id": location_id, "detail": "minimal"}))
+        await asyncio.gather(*tasks)
+
+    async def _catalogs(self) -> None:
+        # Reference catalogs are shared by every location; fetch them once instead of per location.
+        try:
+            with background_priority():
+                sizes = await self._server.prefetch_catalogs()
+        except AppError as e:
+            logger.warning("precompute_catalogs_failed", code=e.code)
+            return
+        if sizes:
+            print("[precompute] catalogs " + " ".join(f"{k}={v}" for k, v in sizes.items()), file=sys.stderr)
+
+    async def run(self, cells: list[Cell]) -> dict[str, int]:
+        await self._catalogs()
+        # Searches are always replayed: when already done they are cache hits and yield the ids to resume.
+        found = await asyncio.gather(*(self._search(c) for c in cells))
+        location_ids = list(dict.fromkeys(i for ids in found for i in ids))
+        await asyncio.gather(*(self._location(i) for i in location_ids))
+        self._report(force=True)
+        return {"cells": len(cells), "locations": len(location_ids), **self.counts}
+
+
+def _parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="outdoor-intelligence-precompute", description=__doc__.splitlines()[0])
+    p.add_argument("--bbox", action="append", default=[], metavar="S,W,N,E", help="Bounding box to cover (repeatable).")
+    p.add_argument("--point", action="append", default=[], metavar="LAT,LON[,RADIUS_KM]", help="Search circle to cover (repeatable).")
+    p.add_argument("--regions-file", help='JSON list of {"bbox": [S, W, N, E]} or {"lat", "lon", "radius_km"} objects.')
+    p.add_argument("--cell-km", type=float, default=5.0, help="Search radius used when tiling bounding boxes.")
+    p.add_argument("--features-radius-km", type=float, default=3.0, help="Profile radius; match what clients request.")
+    p.add_argument(
+        "--conditions",
+        action="store_true",
+        help="Also prefetch weather and alerts (best-effort: their TTLs are minutes, run just before peak).",
+    )
+    p.add_argument("--concurrency", type=int, default=4, help="Maximum tool calls in flight.")
+    p.add_argument("--store", default=settings.shared_state_path, help="Shared state SQLite file (default: SHARED_STATE_PATH).")
+    p.add_argument("--job", help="Progress key for resuming; defaults to a hash of the region arguments.")
+    return p
+
+
+async def _main(args: argparse.Namespace, cells: list[Cell], job: str) -> dict[str, int]:
+    from .core.shared_state import SharedStateStore
+    from .server import OutdoorIntelligenceServer
+
+    server = OutdoorIntelligenceServer()
+    store = SharedStateStore(args.store)
+    try:
+        return await Precompute(
+            server,
+            store,
+            job,
+            concurrency=max(1, args.concurrency),
+            features_radius_km=args.features_radius_km,
+            conditions=args.conditions,
+        ).run(cells)
+    finally:
+        store.close()
+        await server.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.store:
+        parser.error("a persistent store is required: pass --store or set SHARED_STATE_PATH")
+    try:
+        cells = load_regions(args)
+    except (argparse.ArgumentTypeError, OSError, ValueError, KeyError, TypeError) as e:
+        parser.error(str(e))
+    if not cells:
+        parser.error("nothing to precompute: pass --bbox, --point or --regions-file")
+
+    settings.shared_state_path = args.store
+    job = args.job or fingerprint(json.dumps([c.__dict__ for c in cells], sort_keys=True))
+    summary = asyncio.run(_main(args, cells, job))
+    print(json.dumps({"job": job, **summary}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from typing import Protocol, Any
+from typing import Protocol, Any, Optional
+from ..core.budget import ProviderBudget
 from ..core.http import HttpClient
 from ..core.rate_limiter import RateLimiter
 from ..core.settings import settings
+from ..core.shared_state import SharedStateStore
 
 
 class Provider(Protocol):
@@ -11,10 +13,64 @@ class Provider(Protocol):
 
 
 class ProviderContext:
-    def __init__(self, http: HttpClient, limiter: RateLimiter):
+    def __init__(
+        self,
+        http: HttpClient,
+        limiter: RateLimiter,
+        shared: Optional[SharedStateStore] = None,
+        budget: Optional[ProviderBudget] = None,
+    ):
         self.http = http
         self.limiter = limiter
+        self.shared = shared
+        self.budget = budget
+        if budget is not None:
+            # Retried HTTP attempts reach the upstream too, so each one is debited.
+            http.on_retry = budget.spend
+
+    async def acquire(self, provider: str) -> None:
+        """Wait for a rate-limit token, then debit the provider's quota budget.
+
+        The budget is checked up front so exhausted providers fail fast, but only debited once
+        the limiter lets the call through; calls that time out waiting cost no quota.
+        """
+        if self.budget is not None:
+            self.budget.check(provider)
+        await self.limiter.acquire()
+        self.debit(provider)
+
+    def debit(self, provider: str) -> None:
+        """Debit one extra upstream call (e.g. a hedged duplicate) that did not go through acquire()."""
+        if self.budget is not None:
+            self.budget.spend(provider)
+
+    async def close(self) -> None:
+        await self.http.close()
+        if self.budget is not None:
+            self.budget.flush(force=True)
+        if self.shared is not None:
+            self.shared.close()
 
 
 def default_context() -> ProviderContext:
-    return ProviderContext(http=HttpClient(), limiter=RateLimiter(settings.rate_limit_rps))
+    shared = (
+        SharedStateStore(
+            settings.shared_state_path,
+            busy_timeout_s=settings.shared_state_busy_timeout_ms / 1000.0,
+            purge_interval_s=settings.shared_state_purge_interval_s,
+        )
+        if settings.shared_state_path
+        else None
+    )
+    return ProviderContext(
+        http=HttpClient(),
+        limiter=RateLimiter(settings.rate_limit_rps, shared=shared, name="upstream"),
+        shared=shared,
+        budget=ProviderBudget(
+            settings.budget_limits,
+            state_path=settings.budget_state_path,
+            low_watermark=settings.budget_low_watermark,
+            low_ttl_multiplier=settings.budget_low_ttl_multiplier,
+            shared=shared,
+        ),
+    )
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ..core.logging import get_logger
+from ..utils.geo import haversine_km
+
+logger = get_logger(__name__)
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(text: str) -> str:
+    """Casefold, strip diacritics and collapse punctuation, so "Côte-d'Or" matches "cote d or"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+def _grams(text: str, n: int) -> set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+@dataclass
+class _Area:
+    lat: float
+    lon: float
+    radius_km: float
+    fetched_at: float
+    keys: tuple[str, ...] = field(default=())
+
+
+class NameIndex:
+    """N-gram index over named OSM elements already fetched for whole areas.
+
+    An area is registered only after *every* named element inside it was fetched, so any
+    text query whose circle lies inside a registered area can be answered from memory.
+    Areas too dense to fetch whole are remembered as truncated for the same TTL, so queries
+    around them go straight to upstream instead of retrying the area fetch every time.
+
+    Names are posted under their trigrams plus 1- and 2-character grams, so queries shorter
+    than a trigram still narrow to candidates instead of scanning every element.
+    """
+
+    def __init__(self, ttl_s: float, max_elements: int):
+        self._ttl_s = ttl_s
+        self._max_elements = max_elements
+        self._areas: list[_Area] = []
+        self._truncated: list[_Area] = []
+        self._slots: dict[str, int] = {}
+        self._elements: list[dict[str, Any]] = []
+        self._names: list[str] = []
+        self._postings: dict[str, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def clear(self) -> None:
+        self._areas.clear()
+        self._slots.clear()
+        self._elements.clear()
+        self._names.clear()
+        self._postings.clear()
+
+    def covers(self, lat: float, lon: float, radius_km: float) -> bool:
+        now = time.time()
+        live = [a for a in self._areas if now - a.fetched_at < self._ttl_s]
+        if len(live) != len(self._areas):
+            self._rebuild(live)
+        return any(haversine_km(lat, lon, a.lat, a.lon) + radius_km <= a.radius_km for a in self._areas)
+
+    def mark_truncated(self, lat: float, lon: float, radius_km: float) -> None:
+        self._truncated.append(_Area(lat=lat, lon=lon, radius_km=radius_km, fetched_at=time.time()))
+        if len(self._truncated) > 1024:
+            self._truncated.pop(0)
+
+    def truncated(self, lat: float, lon: float) -> bool:
+        """True when the point lies in an area recently found too dense to index."""
+        now = time.time()
+        self._truncated = [a for a in self._truncated if now - a.fetched_at < self._ttl_s]
+        return any(haversine_km(lat, lon, a.lat, a.lon) <= a.radius_km for a in self._truncated)
+
+    def add_area(self, lat: float, lon: float, radius_km: float, elements: list[dict[str, Any]]) -> None:
+        if len(self._elements) + len(elements) > self._max_elements:
+            logger.info("name_index_reset", elements=len(self._elements), incoming=len(elements))
+            self.clear()
+        keys = tuple(key for key in map(self.add, elements) if key is not None)
+        self._areas.append(_Area(lat=lat, lon=lon, radius_km=radius_km, fetched_at=time.time(), keys=keys))
+
+    def _rebuild(self, live: list[_Area]) -> None:
+        """Drop elements that no live area vouches for any more; overlapping areas keep shared ones."""
+        keep = [self._elements[self._slots[key]] for area in live for key in area.keys if key in self._slots]
+        self.clear()
+        for el in keep:
+            self.add(el)
+        self._areas = live
+
+    def add(self, el: dict[str, Any]) -> Optional[str]:
+        """Index one element; returns its key, or None when it has no name."""
+        name = (el.get("tags") or {}).get("name")
+        if not name:
+            return None
+        key = f"{el.get('type')}/{el.get('id')}"
+        if key in self._slots:
+            return key
+        norm = normalize_name(str(name))
+        slot = len(self._elements)
+        self._slots[key] = slot
+        self._elements.append(el)
+        self._names.append(norm)
+        for n in (1, 2, 3):
+            for gram in _grams(norm, n):
+                self._postings.setdefault(gram, set()).add(slot)
+        return key
+
+    def _candidates(self, needle: str) -> set[int]:
+        grams = _grams(needle, min(len(needle), 3))
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        out = set(postings[0])
+        for p in postings[1:]:
+            out &= p
+            if not out:
+                break
+        return out
+
+    def search(self, lat: float, lon: float, radius_km: float, query: str, limit: int) -> list[dict[str, Any]]:
+        """Return elements whose normalized name contains the query, best match then nearest first."""
+        needle = normalize_name(query)
+        if not needle:
+            return []
+        ranked: list[tuple[int, float, int]] = []
+        for slot in self._candidates(needle):
+            name = self._names[slot]
+            pos = name.find(needle)
+            if pos < 0:
+                continue
+            el = self._elements[slot]
+            center = el.get("center") or el
+            if "lat" not in center or "lon" not in center:
+                continue
+            dist = haversine_km(lat, lon, float(center["lat"]), float(center["lon"]))
+            if dist > radius_km:
+                continue
+            if name == needle:
+                quality = 0
+            elif pos == 0:
+                quality = 1
+            elif name[pos - 1] == " ":
+                quality = 2
+            else:
+                quality = 3
+            ranked.append((quality, dist, slot))
+        ranked.sort()
+        return [self._elements[slot] for _q, _d, slot in ranked[:limit]]
@@ -1,33 +1,31 @@
 from __future__ import annotations
 
 import datetime as _dt
-from typing import Any
-import math
+from typing import Any, Optional
 
+from ..core.cache import TTLCache
 from ..core.exceptions import ProviderError
 from ..core.settings import settings
 from ..models.conditions import Alert
+from ..utils.geo import haversine_km
 from .base import ProviderContext
 
+# The whole parks catalog (code, lat, lon per park) is cached under one long-lived key.
+PARKS_CATALOG_KEY = "nps_parks:catalog"
+
 
 class NPSAlertsProvider:
     name = "nps_alerts"
 
-    def __init__(self, ctx: ProviderContext):
+    def __init__(self, ctx: ProviderContext, cache: Optional[TTLCache] = None):
         self._ctx = ctx
+        self._cache = cache
 
     def _distance_km(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        r = 6371.0
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return r * c
-
-    async def _nearest_park_code(self, lat: float, lon: float) -> str:
-        best_code: str | None = None
-        best_dist = float("inf")
+        return haversine_km(lat1, lon1, lat2, lon2)
 
+    async def _fetch_parks(self) -> list[tuple[str, float, float]]:
+        catalog: list[tuple[str, float, float]] = []
         for page in range(settings.nps_parks_max_pages):
             params = {
                 "api_key": settings.nps_api_key,
@@ -35,46 +33,67 @@ class NPSAlertsProvider:
                 "start": page * settings.nps_parks_page_size,
             }
             url = f"{settings.nps_api_base_url}/parks"
-            await self._ctx.limiter.acquire()
-            resp = await self._ctx.http.request("GET", url, params=params, timeout=settings.nps_timeout_s)
-            if resp.status_code != 200:
-                raise ProviderError(
-                    code="nps_http_error",
-                    message="NPS parks endpoint returned error",
-                    details={"status": resp.status_code, "text": resp.text[:500]},
-                )
-            data = resp.json()
-            parks = data.get("data") or []
+            await self._ctx.acquire(self.name)
+            parks = await self._ctx.http.request_cached("GET", url, parse=self._parse_parks, params=params, timeout=settings.nps_timeout_s, provider=self.name)
             if not parks:
                 break
 
             for park in parks:
                 try:
-                    plat = float(park.get("latitude"))
-                    plon = float(park.get("longitude"))
-                except (TypeError, ValueError):
+                    catalog.append((str(park["parkCode"]), float(park.get("latitude")), float(park.get("longitude"))))
+                except (KeyError, TypeError, ValueError):
                     continue
-                dist = self._distance_km(lat, lon, plat, plon)
-                if dist < best_dist:
-                    best_dist = dist
-                    best_code = park.get("parkCode")
-
-        if not best_code:
+        if not catalog:
+            # Raised rather than returned so an empty catalog is only negatively cached, never for nps_parks_ttl_s.
             raise ProviderError(code="nps_no_parks", message="Unable to resolve nearest park for alerts.")
-        return best_code
+        return catalog
+
+    async def parks(self) -> list[tuple[str, float, float]]:
+        """(park code, lat, lon) for every park, paged from /parks once per nps_parks_ttl_s."""
+        if self._cache is None:
+            return await self._fetch_parks()
+        catalog, _meta = await self._cache.get_or_set(PARKS_CATALOG_KEY, self._fetch_parks, ttl_s=settings.nps_parks_ttl_s)
+        return catalog
+
+    async def nearest_park_code(self, lat: float, lon: float) -> str:
+        catalog = await self.parks()
+        code, _plat, _plon = min(catalog, key=lambda p: self._distance_km(lat, lon, p[1], p[2]))
+        return code
+
+    def _check_key(self) -> bool:
+        """False when running in demo mode (no key, fallback enabled)."""
+        if settings.nps_api_key:
+            return True
+        if settings.demo_fallback:
+            return False
+        raise ProviderError(code="missing_api_key", message="NPS_API_KEY is required for real NPS alerts.")
+
+    async def get_alerts(self, park_codes: list[str]) -> list[Alert]:
+        if not self._check_key() or not park_codes:
+            return []
+        params = {"api_key": settings.nps_api_key, "parkCode": ",".join(sorted(park_codes)), "limit": settings.nps_alerts_limit}
+        url = f"{settings.nps_api_base_url}/alerts"
+        await self._ctx.acquire(self.name)
+        return await self._ctx.http.request_cached("GET", url, parse=self._parse_alerts, params=params, timeout=settings.nps_timeout_s, provider=self.name)
 
     async def get_alerts_near(self, lat: float, lon: float, radius_km: float = 50) -> list[Alert]:
         # NPS API does not support geo queries directly; we do a best-effort nearest-park lookup.
-        if not settings.nps_api_key and settings.demo_fallback:
+        if not self._check_key():
             return []
-        if not settings.nps_api_key:
-            raise ProviderError(code="missing_api_key", message="NPS_API_KEY is required for real NPS alerts.")
+        return await self.get_alerts([await self.nearest_park_code(lat, lon)])
 
-        park_code = await self._nearest_park_code(lat, lon)
-        params = {"api_key": settings.nps_api_key, "parkCode": park_code, "limit": settings.nps_alerts_limit}
-        url = f"{settings.nps_api_base_url}/alerts"
-        await self._ctx.limiter.acquire()
-        resp = await self._ctx.http.request("GET", url, params=params, timeout=settings.nps_timeout_s)
+    @staticmethod
+    def _parse_parks(resp) -> list[dict[str, Any]]:
+        if resp.status_code != 200:
+            raise ProviderError(
+                code="nps_http_error",
+                message="NPS parks endpoint returned error",
+                details={"status": resp.status_code, "text": resp.text[:500]},
+            )
+        return resp.json().get("data") or []
+
+    @staticmethod
+    def _parse_alerts(resp) -> list[Alert]:
         if resp.status_code != 200:
             raise ProviderError(
                 code="nps_http_error",
@@ -87,6 +106,8 @@ class NPSAlertsProvider:
         for item in payload.get("data") or []:
             alerts.append(
                 Alert(
+                    id=item.get("id"),
+                    park_code=item.get("parkCode"),
                     source="nps",
                     title=item.get("title") or "Alert",
                     severity=(item.get("severity") or "unknown").lower(),
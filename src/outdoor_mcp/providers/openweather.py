@@ -34,22 +34,24 @@ class OpenWeatherProvider:
         if not settings.openweather_api_key:
             raise ProviderError(code="missing_api_key", message="OPENWEATHER_API_KEY is required for real weather data.")
 
-        await self._ctx.limiter.acquire()
+        await self._ctx.acquire(self.name)
         url = f"{settings.openweather_base_url}/weather"
         resp = await self._ctx.http.request(
             "GET",
             url,
             params={"lat": lat, "lon": lon, "appid": settings.openweather_api_key, "units": "metric"},
             timeout=settings.openweather_timeout_s,
+            provider=self.name,
         )
         if resp.status_code != 200:
             raise ProviderError(code="openweather_http_error", message="OpenWeather returned error", details={"status": resp.status_code, "text": resp.text[:500]})
 
         data = resp.json()
-        now = _dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        # `dt` is when OpenWeather took the observation; downstream TTLs are derived from it.
+        observed = _dt.datetime.utcfromtimestamp(data["dt"]) if isinstance(data.get("dt"), (int, float)) else _dt.datetime.utcnow()
         return WeatherConditions(
             at=Coordinates(lat=lat, lon=lon),
-            observed_at_iso=now,
+            observed_at_iso=observed.replace(microsecond=0).isoformat() + "Z",
             temperature_c=(data.get("main") or {}).get("temp"),
             feels_like_c=(data.get("main") or {}).get("feels_like"),
             wind_m_s=(data.get("wind") or {}).get("speed"),
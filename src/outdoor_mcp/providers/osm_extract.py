@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import math
+from array import array
+from typing import Any, Iterable
+
+from ..core.logging import get_logger
+from ..models.location import Location, NearbyFeature
+from ..utils.geo import bbox_around, haversine_many
+from .name_index import normalize_name
+from .overpass import element_to_feature, element_to_location, is_nearby_feature
+from .ranking import rank_elements
+
+logger = get_logger(__name__)
+
+
+class OSMExtractProvider:
+    """Offline OSM backend answering from pre-downloaded Overpass JSON dumps.
+
+    Tagged elements are reduced to (type, id, tags, lat, lon) and bucketed into a fixed
+    lat/lon grid, so a radius query only scans the handful of cells its bounding box touches.
+    Queries outside the loaded extents must go to Overpass; see `covers`.
+    """
+
+    name = "osm_extract"
+
+    def __init__(self, paths: Iterable[str], cell_deg: float = 0.05):
+        self._cell_deg = cell_deg
+        self._elements: list[dict[str, Any]] = []
+        # Normalized names, parallel to _elements, so text search matches the way NameIndex does.
+        self._names: list[str] = []
+        self._lats = array("d")
+        self._lons = array("d")
+        self._grid: dict[tuple[int, int], array] = {}
+        self._extents: list[tuple[float, float, float, float]] = []
+        for path in paths:
+            self._load(path)
+
+    @property
+    def element_count(self) -> int:
+        return len(self._elements)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return int(math.floor(lat / self._cell_deg)), int(math.floor(lon / self._cell_deg))
+
+    def _load(self, path: str) -> None:
+        with open(path, "rb") as f:
+            data = json.load(f)
+        elements = data.get("elements") or []
+
+        # Ways exported without `out center` only reference node ids; resolve them from the dump.
+        node_coords = {
+            el["id"]: (float(el["lat"]), float(el["lon"]))
+            for el in elements
+            if el.get("type") == "node" and "lat" in el and "lon" in el
+        }
+
+        south, west, north, east = math.inf, math.inf, -math.inf, -math.inf
+        loaded = 0
+        for el in elements:
+            tags = el.get("tags")
+            if not tags:
+                continue
+            center = self._center(el, node_coords)
+            if center is None:
+                continue
+            lat, lon = center
+            idx = len(self._elements)
+            self._elements.append({"type": el.get("type"), "id": el.get("id"), "tags": tags, "lat": lat, "lon": lon})
+            self._names.append(normalize_name(str(tags.get("name", ""))))
+            self._lats.append(lat)
+            self._lons.append(lon)
+            self._grid.setdefault(self._cell(lat, lon), array("I")).append(idx)
+            south, west, north, east = min(south, lat), min(west, lon), max(north, lat), max(east, lon)
+            loaded += 1
+
+        bounds = data.get("bounds")
+        if bounds:
+            self._extents.append((float(bounds["minlat"]), float(bounds["minlon"]), float(bounds["maxlat"]), float(bounds["maxlon"])))
+        elif loaded:
+            self._extents.append((south, west, north, east))
+        logger.info("osm_extract_loaded", path=path, elements=loaded)
+
+    @staticmethod
+    def _center(el: dict[str, Any], node_coords: dict[int, tuple[float, float]]) -> tuple[float, float] | None:
+        if "lat" in el and "lon" in el:
+            return float(el["lat"]), float(el["lon"])
+        if "center" in el:
+            return float(el["center"]["lat"]), float(el["center"]["lon"])
+        if "bounds" in el:
+            b = el["bounds"]
+            return (float(b["minlat"]) + float(b["maxlat"])) / 2, (float(b["minlon"]) + float(b["maxlon"])) / 2
+        refs = [node_coords[n] for n in el.get("nodes") or [] if n in node_coords]
+        if refs:
+            return sum(p[0] for p in refs) / len(refs), sum(p[1] for p in refs) / len(refs)
+        return None
+
+    def covers(self, lat: float, lon: float, radius_km: float) -> bool:
+        s, w, n, e = bbox_around(lat, lon, radius_km)
+        return any(s >= es and w >= ew and n <= en and e <= ee for es, ew, en, ee in self._extents)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> list[int]:
+        s, w, n, e = bbox_around(lat, lon, radius_km)
+        (r0, c0), (r1, c1) = self._cell(s, w), self._cell(n, e)
+        found: list[int] = []
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                found.extend(self._grid.get((r, c), ()))
+        return found
+
+    def _within(self, lat: float, lon: float, radius_km: float) -> list[tuple[float, int]]:
+        idx = self._candidates(lat, lon, radius_km)
+        dists = haversine_many(lat, lon, [self._lats[i] for i in idx], [self._lons[i] for i in idx])
+        hits = [(d, i) for d, i in zip(dists, idx) if d <= radius_km]
+        hits.sort()
+        return hits
+
+    async def search_locations(self, lat: float, lon: float, radius_km: float, query: str | None, limit: int = 10) -> list[Location]:
+        needle = normalize_name(query) if query else None
+        if needle == "":
+            return []
+        matches = [
+            self._elements[i]
+            for i in self._candidates(lat, lon, radius_km)
+            if needle is None or needle in self._names[i]
+        ]
+        results: list[Location] = []
+        for el, dist in rank_elements(lat, lon, matches, limit, radius_km=radius_km):
+            loc = element_to_location(el, source=self.name, distance_km=dist)
+            if loc is not None:
+                results.append(loc)
+        return results
+
+    async def nearby_features(self, lat: float, lon: float, radius_km: float) -> list[NearbyFeature]:
+        features: list[NearbyFeature] = []
+        for _dist, idx in self._within(lat, lon, radius_km):
+            el = self._elements[idx]
+            if is_nearby_feature(el):
+                features.append(element_to_feature(el))
+                if len(features) >= 50:
+                    break
+        return features
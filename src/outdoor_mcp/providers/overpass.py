@@ -10,19 +10,160 @@ from ..models.location import Location, NearbyFeature
 from ..models.common import Coordinates
 from ..core.settings import settings
 from .base import ProviderContext
+from .name_index import NameIndex
+from .overpass_batch import OverpassBatcher
+from .overpass_mirrors import MirrorPool
+from .ranking import rank_elements, with_distances
 
 logger = get_logger(__name__)
 
+# Server-side [timeout:] of a single query; merged batches get a multiple of it.
+QUERY_TIMEOUT_S = 25
+
+
+def element_center(el: dict[str, Any]) -> Coordinates | None:
+    if "lat" in el and "lon" in el:
+        return Coordinates(lat=float(el["lat"]), lon=float(el["lon"]))
+    if "center" in el:
+        return Coordinates(lat=float(el["center"]["lat"]), lon=float(el["center"]["lon"]))
+    return None
+
+
+def element_to_location(el: dict[str, Any], source: str, distance_km: float | None = None) -> Location | None:
+    tags = el.get("tags") or {}
+    name = tags.get("name") or "Unknown"
+    kind = "poi"
+    if tags.get("highway") == "path" or tags.get("route") == "hiking":
+        kind = "trail"
+    if tags.get("leisure") == "park":
+        kind = "park"
+
+    center = element_center(el)
+    if center is None:
+        return None
+
+    loc_id = f"osm:{el.get('type','el')}:{el.get('id')}:{center.lat:.6f}:{center.lon:.6f}"
+    return Location(
+        id=loc_id,
+        name=name,
+        kind=kind,
+        center=center,
+        source=source,
+        confidence=0.75,
+        distance_km=round(distance_km, 3) if distance_km is not None else None,
+    )
+
+
+def is_nearby_feature(el: dict[str, Any]) -> bool:
+    """Client-side equivalent of the tag filters used by `OverpassProvider.nearby_features`."""
+    tags = el.get("tags") or {}
+    etype = el.get("type")
+    if etype == "node":
+        return bool(tags.get("amenity") or tags.get("tourism") or tags.get("natural")) or tags.get("leisure") == "park"
+    if etype == "way":
+        return tags.get("highway") == "path"
+    if etype == "relation":
+        return tags.get("route") == "hiking"
+    return False
+
+
+def element_to_feature(el: dict[str, Any]) -> NearbyFeature:
+    tags = el.get("tags") or {}
+    name = tags.get("name")
+    kind = tags.get("amenity") or tags.get("tourism") or tags.get("natural") or tags.get("leisure") or tags.get("highway") or tags.get("route") or "feature"
+    return NearbyFeature(kind=str(kind), name=name, center=element_center(el), tags={k: str(v) for k, v in tags.items() if isinstance(v,(str,int,float))})
+
 
 class OverpassProvider:
     name = "osm_overpass"
 
     def __init__(self, ctx: ProviderContext):
         self._ctx = ctx
+        self._names = NameIndex(ttl_s=settings.name_index_ttl_s, max_elements=settings.name_index_max_elements)
+        self._mirrors = MirrorPool(
+            settings.overpass_urls or [settings.overpass_url],
+            hedge=settings.overpass_hedge,
+            hedge_min_delay_s=settings.overpass_hedge_min_delay_s,
+            cooldown_s=settings.overpass_mirror_cooldown_s,
+        )
+        self._batcher = OverpassBatcher(
+            self._post,
+            window_s=settings.overpass_batch_window_ms / 1000.0,
+            max_batch=settings.overpass_batch_max,
+            timeout_s=QUERY_TIMEOUT_S,
+            max_timeout_s=settings.overpass_batch_max_timeout_s,
+        )
+
+    async def _query(self, body: str) -> list[dict[str, Any]]:
+        return await self._batcher.submit(body)
+
+    async def _post(self, body: str, timeout_s: int) -> list[dict[str, Any]]:
+        q = f"[out:json][timeout:{timeout_s}];\n{body}"
+        # Merged batches get a longer server timeout; give the HTTP request the same headroom.
+        http_timeout_s = settings.overpass_timeout_s * max(1.0, timeout_s / QUERY_TIMEOUT_S)
+        await self._ctx.acquire(self.name)
+        sends = 0
+
+        async def send(url: str) -> list[dict[str, Any]]:
+            nonlocal sends
+            sends += 1
+            if sends > 1:
+                # Hedged duplicates and fail-overs are upstream calls of their own.
+                self._ctx.debit(self.name)
+            return await self._ctx.http.request_cached(
+                "POST",
+                url,
+                parse=self._parse_elements,
+                data={"data": q},
+                timeout=http_timeout_s,
+                provider=self.name,
+            )
+
+        return await self._mirrors.call(send)
+
+    @staticmethod
+    def _parse_elements(resp) -> list[dict[str, Any]]:
+        if resp.status_code != 200:
+            raise ProviderError(code="overpass_http_error", message="Overpass API returned error", details={"status": resp.status_code, "text": resp.text[:500]})
+        data = resp.json()
+        return data.get("elements", [])
+
+    async def _index_named_area(self, lat: float, lon: float, radius_km: float) -> bool:
+        """Fetch every named element around a point into the name index; False if the area was truncated."""
+        radius_m = int(max(100, radius_km * 1000))
+        fetch_limit = settings.name_index_fetch_limit
+        q = f"""
+        (
+          node(around:{radius_m},{lat},{lon})[name];
+          way(around:{radius_m},{lat},{lon})[name];
+          relation(around:{radius_m},{lat},{lon})[name];
+        );
+        out center {fetch_limit};
+        """
+        # Never batched: this one fetch can take a whole query's server time on its own.
+        elements = await self._post(q, QUERY_TIMEOUT_S)
+        if len(elements) >= fetch_limit:
+            logger.info("name_index_area_truncated", lat=lat, lon=lon, radius_km=radius_km, elements=len(elements))
+            self._names.mark_truncated(lat, lon, radius_km)
+            return False
+        self._names.add_area(lat, lon, radius_km, elements)
+        return True
 
     async def search_locations(self, lat: float, lon: float, radius_km: float, query: str | None, limit: int = 10) -> list[Location]:
-        await self._ctx.limiter.acquire()
+        # Text queries in small areas are answered from the local name index; the area's named
+        # elements are fetched once with a plain [name] filter instead of a regex per query.
+        if query and radius_km <= settings.name_index_max_radius_km and not self._names.truncated(lat, lon):
+            covered = self._names.covers(lat, lon, radius_km)
+            if not covered:
+                covered = await self._index_named_area(lat, lon, max(radius_km, settings.name_index_area_km))
+            if covered:
+                # Already ordered by name-match quality, then distance.
+                matches = self._names.search(lat, lon, radius_km, query, limit)
+                return self._to_locations(with_distances(lat, lon, matches))
+
         radius_m = int(max(100, radius_km * 1000))
+        # Overpass emits elements in id order, not by distance: over-fetch and rank locally.
+        fetch = max(limit, min(settings.search_overfetch_max, limit * settings.search_overfetch_factor))
 
         # Simple, robust query: search for named nodes/ways/relations matching query within radius.
         name_filter = ""
@@ -30,47 +171,29 @@ class OverpassProvider:
             safe = re.escape(query)
             name_filter = f'[name~"{safe}",i]'
         q = f"""
-        [out:json][timeout:25];
         (
           node(around:{radius_m},{lat},{lon}){name_filter};
           way(around:{radius_m},{lat},{lon}){name_filter};
           relation(around:{radius_m},{lat},{lon}){name_filter};
         );
-        out center {limit};
+        out center {fetch};
         """
 
-        resp = await self._ctx.http.request("POST", settings.overpass_url, data={"data": q}, timeout=settings.overpass_timeout_s)
-        if resp.status_code != 200:
-            raise ProviderError(code="overpass_http_error", message="Overpass API returned error", details={"status": resp.status_code, "text": resp.text[:500]})
+        # No radius cut here: Overpass matched on geometry, and a way's center may lie outside the circle.
+        elements = await self._query(q)
+        return self._to_locations(rank_elements(lat, lon, elements, limit))
 
-        data = resp.json()
-        elements = data.get("elements", [])
-        results: list[Location] = []
-        for el in elements[:limit]:
-            name = (el.get("tags") or {}).get("name") or "Unknown"
-            kind = "poi"
-            if (el.get("tags") or {}).get("highway") == "path" or (el.get("tags") or {}).get("route") == "hiking":
-                kind = "trail"
-            if (el.get("tags") or {}).get("leisure") == "park":
-                kind = "park"
-
-            center = None
-            if "lat" in el and "lon" in el:
-                center = Coordinates(lat=float(el["lat"]), lon=float(el["lon"]))
-            elif "center" in el:
-                center = Coordinates(lat=float(el["center"]["lat"]), lon=float(el["center"]["lon"]))
-            else:
-                continue
-
-            loc_id = f"osm:{el.get('type','el')}:{el.get('id')}:{center.lat:.6f}:{center.lon:.6f}"
-            results.append(Location(id=loc_id, name=name, kind=kind, center=center, source=self.name, confidence=0.75))
+    def _to_locations(self, ranked: list[tuple[dict[str, Any], float]]) -> list[Location]:
+        results = []
+        for el, dist in ranked:
+            loc = element_to_location(el, source=self.name, distance_km=dist)
+            if loc is not None:
+                results.append(loc)
         return results
 
     async def nearby_features(self, lat: float, lon: float, radius_km: float) -> list[NearbyFeature]:
-        await self._ctx.limiter.acquire()
         radius_m = int(max(100, radius_km * 1000))
         q = f"""
-        [out:json][timeout:25];
         (
           node(around:{radius_m},{lat},{lon})[amenity];
           node(around:{radius_m},{lat},{lon})[tourism];
@@ -81,19 +204,5 @@ class OverpassProvider:
         );
         out center 50;
         """
-        resp = await self._ctx.http.request("POST", settings.overpass_url, data={"data": q}, timeout=settings.overpass_timeout_s)
-        if resp.status_code != 200:
-            raise ProviderError(code="overpass_http_error", message="Overpass API returned error", details={"status": resp.status_code, "text": resp.text[:500]})
-        data = resp.json()
-        features: list[NearbyFeature] = []
-        for el in data.get("elements", [])[:50]:
-            tags = el.get("tags") or {}
-            name = tags.get("name")
-            kind = tags.get("amenity") or tags.get("tourism") or tags.get("natural") or tags.get("leisure") or tags.get("highway") or tags.get("route") or "feature"
-            center = None
-            if "lat" in el and "lon" in el:
-                center = Coordinates(lat=float(el["lat"]), lon=float(el["lon"]))
-            elif "center" in el:
-                center = Coordinates(lat=float(el["center"]["lat"]), lon=float(el["center"]["lon"]))
-            features.append(NearbyFeature(kind=str(kind), name=name, center=center, tags={k: str(v) for k, v in tags.items() if isinstance(v,(str,int,float))}))
-        return features
+        elements = await self._query(q)
+        return [element_to_feature(el) for el in elements[:50]]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_SPLIT_TYPE = "batch_split"
+
+
+class OverpassBatcher:
+    """Coalesces Overpass query bodies submitted within a short window into one POST.
+
+    Each body is a `( ... ); out ...;` block. A merged query runs the blocks back to back and
+    emits a `make batch_split` marker element after each one, so the combined element stream
+    can be cut back into exactly what each caller would have received on its own, while the
+    whole batch costs one rate-limit token and one Overpass slot.
+
+    The merged query's server timeout is the per-query timeout times the batch size, so a
+    batch is cut at `max_batch` bodies or `max_timeout_s` of combined timeout, whichever is
+    smaller.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, int], Awaitable[list[dict[str, Any]]]],
+        *,
+        window_s: float,
+        max_batch: int,
+        timeout_s: int = 25,
+        max_timeout_s: int = 180,
+    ):
+        self._run = run
+        self._window_s = window_s
+        self._max_batch = max(1, min(max_batch, max_timeout_s // timeout_s))
+        self._timeout_s = timeout_s
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.coalesced = 0
+
+    async def submit(self, body: str) -> list[dict[str, Any]]:
+        if self._window_s <= 0:
+            return await self._run(body, self._timeout_s)
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._pending.append((body, fut))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_s, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._execute(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        self.batches += 1
+        try:
+            if len(batch) == 1:
+                results = [await self._run(batch[0][0], self._timeout_s)]
+            else:
+                self.coalesced += len(batch) - 1
+                body = "\n".join(f"{b}\nmake {_SPLIT_TYPE} idx={i};\nout;" for i, (b, _f) in enumerate(batch))
+                # The server-side timeout covers the whole merged query.
+                timeout_s = self._timeout_s * len(batch)
+                results = self._split(await self._run(body, timeout_s), len(batch))
+                logger.debug("overpass_batch", size=len(batch))
+        except asyncio.CancelledError:
+            for _b, fut in batch:
+                fut.cancel()
+            raise
+        except Exception as e:
+            for _b, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_b, fut), elements in zip(batch, results):
+            if not fut.done():
+                fut.set_result(elements)
+
+    @staticmethod
+    def _split(elements: list[dict[str, Any]], parts: int) -> list[list[dict[str, Any]]]:
+        out: list[list[dict[str, Any]]] = [[] for _ in range(parts)]
+        current: list[dict[str, Any]] = []
+        for el in elements:
+            if el.get("type") == _SPLIT_TYPE:
+                idx = int((el.get("tags") or {}).get("idx", -1))
+                if 0 <= idx < parts:
+                    out[idx] = current
+                current = []
+            else:
+                current.append(el)
+        return out
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+import httpx
+
+from ..core.exceptions import ProviderError
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def is_mirror_failure(exc: BaseException) -> bool:
+    """True for network errors, timeouts, 429 and 5xx; query errors (e.g. 400) fail on any mirror."""
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, ProviderError):
+        if exc.code == "network_error":
+            return True
+        status = (exc.details or {}).get("status")
+        return isinstance(status, int) and (status == 429 or status >= 500)
+    return False
+
+
+@dataclass
+class MirrorStats:
+    url: str
+    ewma_latency_s: float | None = None
+    error_rate: float = 0.0
+    cooldown_until: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=100))
+    # Longest time a cancelled (hedge-losing) call ran: a lower bound only, cleared by the next
+    # completed call and never mixed into the latency samples.
+    slow_floor_s: float = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def score(self, fallback_latency_s: float) -> float:
+        latency = self.ewma_latency_s if self.ewma_latency_s is not None else fallback_latency_s
+        return max(latency, self.slow_floor_s) * (1.0 + 4.0 * self.error_rate)
+
+    def p90(self) -> float | None:
+        if len(self.latencies) < 5:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+
+class MirrorPool:
+    """Routes each call to the best-scoring healthy mirror and hedges slow calls to the runner-up.
+
+    Scores are an EWMA of latency inflated by an EWMA of the error rate. Once the primary has a
+    p90 latency, a call still pending after it gets a duplicate on the next healthy mirror;
+    whichever succeeds first wins and the other is cancelled. Failing mirrors sit out a short
+    cooldown: they rank last and are never picked as a hedge or fail-over target.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        *,
+        hedge: bool = True,
+        hedge_min_delay_s: float = 0.5,
+        cooldown_s: float = 30.0,
+        alpha: float = 0.2,
+    ):
+        self.mirrors = [MirrorStats(url=u) for u in dict.fromkeys(urls)]
+        self._hedge = hedge
+        self._hedge_min_delay_s = hedge_min_delay_s
+        self._cooldown_s = cooldown_s
+        self._alpha = alpha
+        self.hedged = 0
+
+    def ranked(self) -> list[MirrorStats]:
+        now = time.time()
+        known = [m.ewma_latency_s for m in self.mirrors if m.ewma_latency_s is not None]
+        # Unmeasured mirrors rank as average so they get explored without jumping the queue.
+        fallback = sum(known) / len(known) if known else 1.0
+        return sorted(self.mirrors, key=lambda m: (not m.healthy(now), m.score(fallback)))
+
+    def _record(self, mirror: MirrorStats, latency_s: float | None, ok: bool) -> None:
+        a = self._alpha
+        mirror.error_rate = (1 - a) * mirror.error_rate + a * (0.0 if ok else 1.0)
+        if ok and latency_s is not None:
+            mirror.latencies.append(latency_s)
+            mirror.ewma_latency_s = latency_s if mirror.ewma_latency_s is None else (1 - a) * mirror.ewma_latency_s + a * latency_s
+            mirror.slow_floor_s = 0.0
+        if not ok and len(self.mirrors) > 1:
+            # A lone mirror has nowhere to fail over to; benching it would only hide it.
+            mirror.cooldown_until = time.time() + self._cooldown_s
+            logger.warning("overpass_mirror_failed", url=mirror.url, error_rate=round(mirror.error_rate, 3))
+
+    async def _timed(self, mirror: MirrorStats, fn: Callable[[str], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            result = await fn(mirror.url)
+        except asyncio.CancelledError:
+            # Lost a hedge race (or the caller gave up): the elapsed time is only a lower bound on
+            # its latency, so it is kept apart from the EWMA and p90 samples.
+            mirror.slow_floor_s = max(mirror.slow_floor_s, time.perf_counter() - start)
+            raise
+        except Exception as e:
+            if is_mirror_failure(e):
+                self._record(mirror, None, ok=False)
+            raise
+        self._record(mirror, time.perf_counter() - start, ok=True)
+        return result
+
+    async def call(self, fn: Callable[[str], Awaitable[T]]) -> T:
+        ranked = self.ranked()
+        primary = ranked[0]
+        if len(ranked) == 1 or not ranked[1].healthy(time.time()):
+            return await self._timed(primary, fn)
+        secondary = ranked[1]
+
+        first = asyncio.ensure_future(self._timed(primary, fn))
+        # No hedging until the primary's p90 is known: a guessed delay would duplicate most
+        # queries right after startup.
+        p90 = primary.p90()
+        delay = max(self._hedge_min_delay_s, p90) if self._hedge and p90 is not None else None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+        if first in done:
+            failure = first.exception()
+            if failure is None:
+                return first.result()
+            if not is_mirror_failure(failure):
+                # The query itself is bad; every mirror would reject it the same way.
+                raise failure
+            # Primary failed outright: fail over instead of hedging.
+            return await self._timed(secondary, fn)
+
+        self.hedged += 1
+        second = asyncio.ensure_future(self._timed(secondary, fn))
+        pending = {first, second}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        return task.result()
+                    if not is_mirror_failure(exc):
+                        raise exc
+                    error = exc
+        finally:
+            for task in pending:
+                task.cancel()
+        assert error is not None
+        raise error
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        now = time.time()
+        return [
+            {
+                "url": m.url,
+                "healthy": m.healthy(now),
+                "ewma_latency_s": round(m.ewma_latency_s, 3) if m.ewma_latency_s is not None else None,
+                "p90_s": round(p90, 3) if (p90 := m.p90()) is not None else None,
+                "error_rate": round(m.error_rate, 3),
+            }
+            for m in self.mirrors
+        ]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+from ..utils.geo import haversine_many
+
+# Multipliers on distance when ranking search candidates: at equal distance trails and parks
+# come before named outdoor POIs, which come before generic or unnamed elements.
+_TRAIL_PARK_WEIGHT = 0.6
+_OUTDOOR_WEIGHT = 0.8
+_GENERIC_WEIGHT = 1.0
+_UNNAMED_WEIGHT = 1.5
+# Keeps elements a few metres away from all tying at zero, so relevance still orders them.
+_DISTANCE_FLOOR_KM = 0.05
+
+
+def relevance_weight(tags: dict[str, Any]) -> float:
+    if not tags.get("name"):
+        return _UNNAMED_WEIGHT
+    if tags.get("highway") == "path" or tags.get("route") == "hiking" or tags.get("leisure") == "park":
+        return _TRAIL_PARK_WEIGHT
+    if tags.get("tourism") or tags.get("natural") or tags.get("boundary") == "national_park":
+        return _OUTDOOR_WEIGHT
+    return _GENERIC_WEIGHT
+
+
+def _centers(elements: Sequence[dict[str, Any]]) -> tuple[list[int], list[float], list[float]]:
+    idx: list[int] = []
+    lats: list[float] = []
+    lons: list[float] = []
+    for i, el in enumerate(elements):
+        center = el if "lat" in el and "lon" in el else el.get("center")
+        if not center or "lat" not in center or "lon" not in center:
+            continue
+        idx.append(i)
+        lats.append(float(center["lat"]))
+        lons.append(float(center["lon"]))
+    return idx, lats, lons
+
+
+def with_distances(lat: float, lon: float, elements: Sequence[dict[str, Any]]) -> list[tuple[dict[str, Any], float]]:
+    """(element, distance_km) for every element with a position, in input order."""
+    idx, lats, lons = _centers(elements)
+    return [(elements[i], dist) for i, dist in zip(idx, haversine_many(lat, lon, lats, lons))]
+
+
+def rank_elements(
+    lat: float,
+    lon: float,
+    elements: Sequence[dict[str, Any]],
+    limit: int,
+    radius_km: Optional[float] = None,
+) -> list[tuple[dict[str, Any], float]]:
+    """Top `limit` (element, distance_km) pairs by relevance-weighted distance.
+
+    Distances for all candidates are computed in one batch before anything is filtered;
+    `radius_km` drops candidates whose position lies outside the circle.
+    """
+    pairs = with_distances(lat, lon, elements)
+    scored = [
+        ((dist + _DISTANCE_FLOOR_KM) * relevance_weight(el.get("tags") or {}), dist, i)
+        for i, (el, dist) in enumerate(pairs)
+        if radius_km is None or dist <= radius_km
+    ]
+    scored.sort()
+    return [pairs[i] for _score, _dist, i in scored[:limit]]
@@ -1,34 +1,57 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as _dt
-from typing import Any, Optional
+import os
+import socket
+from typing import Any, Callable
 import uuid
 
 from mcp.server.fastmcp import FastMCP
 
-from .core.logging import configure_logging, get_logger
+from .core.logging import configure_logging, get_logger, log_stats
 from .core.settings import settings
 from .core.cache import TTLCache
+from .core.admission import AdmissionController
+from .core.ttl_policy import TTLPolicy
+from .core.runtime import LoopWatchdog
 from .core.exceptions import AppError, ValidationError
 from .providers.base import default_context
 from .providers.overpass import OverpassProvider
+from .providers.osm_extract import OSMExtractProvider
 from .providers.openweather import OpenWeatherProvider
 from .providers.nps import NPSAlertsProvider
 from .services.location_service import LocationService
 from .services.conditions_service import ConditionsService
 from .services.risk_service import RiskService
+from .services.location_registry import LocationRegistry
+from .services.alerts_watch import AlertsWatchService
 from .models.common import ToolResponse, ToolErrorResponse, Provenance
 from .models.common import Coordinates
+from .models.conditions import Alert, RealTimeConditions
+from .models.location import Location, LocationProfile
+from .models.risk import RiskAssessment
 from .utils.ids import coords_from_location_id
+from .utils.cursors import decode_cursor, encode_cursor, fingerprint
+from .tools.projection import include_for
 from .tools.schemas import (
     SearchLocationsInput,
     GetLocationProfileInput,
     GetRealTimeConditionsInput,
     RiskAndSafetySummaryInput,
+    WatchAlertsInput,
+    CacheStatsInput,
+    DiagnosticsInput,
 )
 
 logger = get_logger(__name__)
 
+# Upstream providers each cache family depends on, for quota-aware caching.
+OSM_PROVIDERS = (OverpassProvider.name,)
+CONDITIONS_PROVIDERS = (OpenWeatherProvider.name, NPSAlertsProvider.name)
+
+SYNTHETIC_ANCHOR_NAME = "Location Anchor"
+
 
 def _now_iso() -> str:
     return _dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
@@ -39,25 +62,69 @@ class OutdoorIntelligenceServer:
         configure_logging()
         self.mcp = FastMCP(settings.server_name)
 
-        # infra
-        self._cache = TTLCache(default_ttl_s=settings.cache_ttl_s)
-
         # providers
         ctx = default_context()
         self._ctx = ctx
+
+        # infra
+        self._cache = TTLCache(
+            default_ttl_s=settings.cache_ttl_s,
+            shared=ctx.shared,
+            negative_ttls=settings.negative_cache_ttls,
+            negative_max_ttl_s=settings.negative_cache_max_ttl_s,
+            compress_min_bytes=settings.cache_compress_min_bytes,
+            compress_level=settings.cache_compress_level,
+            hot_set_size=settings.cache_hot_set_size,
+            stale_grace_s=settings.cache_stale_grace_s,
+        )
+        preloaded = self._cache.preload(settings.cache_preload_max_entries)
+        if preloaded:
+            logger.info("cache_preloaded", entries=preloaded)
+        self._ttl = TTLPolicy(
+            osm_ttl_s=settings.cache_ttl_osm_s,
+            alerts_ttl_s=settings.cache_ttl_alerts_s,
+            weather_interval_s=settings.cache_ttl_weather_interval_s,
+            weather_min_ttl_s=settings.cache_ttl_weather_min_s,
+            weather_max_ttl_s=settings.cache_ttl_weather_max_s,
+        )
         self._overpass = OverpassProvider(ctx)
         self._weather = OpenWeatherProvider(ctx)
-        self._nps = NPSAlertsProvider(ctx)
+        self._nps = NPSAlertsProvider(ctx, cache=self._cache)
+        self._extract = (
+            OSMExtractProvider(settings.osm_extract_paths, cell_deg=settings.osm_extract_cell_deg)
+            if settings.osm_extract_paths
+            else None
+        )
+
+        self._admission = AdmissionController(
+            max_concurrency=settings.admission_max_concurrency,
+            tool_max_concurrency=settings.admission_tool_max_concurrency,
+            max_queue=settings.admission_max_queue,
+            max_wait_s=settings.admission_max_wait_s,
+            tool_limits=settings.admission_tool_limits,
+        )
 
         # services
-        self._locations = LocationService(self._overpass)
-        self._conditions = ConditionsService(self._weather, self._nps)
+        self._locations = LocationService(self._overpass, extract=self._extract)
+        self._conditions = ConditionsService(self._weather, self._nps, cache=self._cache, ttl=self._ttl)
         self._risk = RiskService()
+        self._alerts_watch = AlertsWatchService(self._nps, self._cache, ttl=self._ttl)
+
+        self._watchdog = (
+            LoopWatchdog(interval_s=settings.loop_watchdog_interval_s, threshold_s=settings.loop_watchdog_threshold_s)
+            if settings.loop_watchdog or settings.runtime_mode == "performance"
+            else None
+        )
+        self._registry = LocationRegistry(settings.location_registry_size, path=settings.location_registry_path, shared=ctx.shared)
 
         self._register_tools()
+        self._register_admin_tools()
 
     async def close(self) -> None:
-        await self._ctx.http.close()
+        if self._watchdog is not None:
+            await self._watchdog.stop()
+        await self._registry.close()
+        await self._ctx.close()
 
     def _ok(self, data: dict, *, provenance: Provenance, cache_meta: dict | None = None, warnings: list[str] | None = None, request_id: str | None = None):
         if request_id:
@@ -77,11 +144,59 @@ class OutdoorIntelligenceServer:
 
     def _coords_from_input(self, location_id: str | None, lat: float | None, lon: float | None) -> Coordinates:
         if location_id:
+            known = self._registry.get(location_id)
+            if known is not None:
+                return known.center
             return coords_from_location_id(location_id)
         if lat is None or lon is None:
             raise ValidationError(code="missing_coordinates", message="Provide either location_id or lat/lon.")
         return Coordinates(lat=lat, lon=lon)
 
+    def _location_from_input(self, location_id: str | None, coords: Coordinates) -> Location:
+        if location_id:
+            known = self._registry.get(location_id)
+            if known is not None:
+                return known
+        # Unknown id (e.g. from before a restart without a persisted registry) or bare coordinates.
+        return Location(
+            id=location_id or f"coord:{coords.lat:.6f}:{coords.lon:.6f}",
+            name=SYNTHETIC_ANCHOR_NAME,
+            kind="region",
+            center=coords,
+            source="fusion",
+            confidence=0.6,
+        )
+
+    async def _cached(self, tool: str, key: str, factory, ttl_s: int | Callable[[Any], int], providers: tuple[str, ...] = ()):
+        try:
+            return await self._cached_fetch(tool, key, factory, ttl_s, providers)
+        except AppError as e:
+            # Out of quota (fresh or negatively cached): serve whatever is still within stale grace.
+            if e.code != "quota_exhausted":
+                raise
+            stale = self._cache.get_stale(key)
+            if stale is None:
+                raise
+            return stale
+
+    async def _cached_fetch(self, tool: str, key: str, factory, ttl_s: int | Callable[[Any], int], providers: tuple[str, ...]):
+        # Warm keys never queue behind cold misses; only work that may hit upstream is admitted.
+        if self._cache.is_warm(key):
+            return await self._cache.get_or_set(key, factory, ttl_s=ttl_s)
+
+        budget = self._ctx.budget
+        low = budget is not None and budget.is_low(providers)
+        if low:
+            # Quota is running out: prefer stale data and keep fresh data longer.
+            stale = self._cache.get_stale(key)
+            if stale is not None:
+                return stale
+            multiplier = budget.ttl_multiplier(providers)
+            base_ttl = ttl_s
+            ttl_s = (lambda value: int(base_ttl(value) * multiplier)) if callable(base_ttl) else int(base_ttl * multiplier)
+        async with self._admission.admit(tool):
+            return await self._cache.get_or_set(key, factory, ttl_s=ttl_s)
+
     def _register_tools(self) -> None:
         @self.mcp.tool()
         async def search_locations(args: SearchLocationsInput) -> dict[str, Any]:
@@ -89,13 +204,31 @@ class OutdoorIntelligenceServer:
             request_id = self._new_request_id()
             query = (args.query or "").strip()
             query_norm = query.lower() if query else "*"
-            key = f"search:{args.lat:.5f}:{args.lon:.5f}:{args.radius_km:.2f}:{query_norm}:{args.limit}"
+            # One distance-sorted result set per area and query; limit/cursor only slice it.
+            key = f"search:{args.lat:.5f}:{args.lon:.5f}:{args.radius_km:.2f}:{query_norm}"
             try:
-                async def factory():
-                    return await self._locations.search(args.lat, args.lon, args.radius_km, query or None, limit=args.limit)
+                # Reject bad field paths before spending a provider call on them.
+                include = include_for(Location, args.detail, args.fields)
+                offset = 0
+                if args.cursor:
+                    cursor = decode_cursor(args.cursor)
+                    if cursor.get("k") != fingerprint(key) or not isinstance(cursor.get("o"), int) or cursor["o"] < 0:
+                        raise ValidationError(code="invalid_cursor", message="Cursor does not belong to this search.")
+                    offset = cursor["o"]
 
-                (locations, prov), cache_meta = await self._cache.get_or_set(key, factory, ttl_s=min(settings.cache_ttl_s, 900))
-                data = {"locations": [l.model_dump() for l in locations]}
+                async def factory():
+                    return await self._locations.search(args.lat, args.lon, args.radius_km, query or None, limit=settings.search_result_set_size)
+
+                (locations, prov), cache_meta = await self._cached("search_locations", key, factory, ttl_s=self._ttl.osm_ttl_s, providers=OSM_PROVIDERS)
+                page = locations[offset : offset + args.limit]
+                # distance_km is relative to this search's center; it means nothing to later lookups by id.
+                self._registry.add_many(l.model_copy(update={"distance_km": None}) for l in page)
+                end = offset + len(page)
+                data = {
+                    "locations": [l.model_dump(include=include) for l in page],
+                    "total": len(locations),
+                    "next_cursor": encode_cursor({"k": fingerprint(key), "o": end}) if end < len(locations) else None,
+                }
                 if not cache_meta["hit"]:
                     prov.fetched_at_iso = _now_iso()
                 return self._ok(data, provenance=prov, cache_meta=cache_meta, request_id=request_id)
@@ -109,30 +242,23 @@ class OutdoorIntelligenceServer:
             """Get a normalized profile for a location, including nearby features."""
             request_id = self._new_request_id()
             try:
+                include = include_for(LocationProfile, args.detail, args.fields)
                 coords = self._coords_from_input(args.location_id, args.lat, args.lon)
-
-                # If we got a location_id, do a lightweight re-hydration by searching its name isn't possible.
-                # Instead, we create a synthetic Location anchor from coordinates.
-                from .models.location import Location
-                location = Location(
-                    id=args.location_id or f"coord:{coords.lat:.6f}:{coords.lon:.6f}",
-                    name="Location Anchor",
-                    kind="region",
-                    center=coords,
-                    source="fusion",
-                    confidence=0.6,
-                )
+                location = self._location_from_input(args.location_id, coords)
 
                 key = f"profile:{coords.lat:.5f}:{coords.lon:.5f}:{args.features_radius_km:.2f}"
                 async def factory():
                     return await self._locations.profile(location, features_radius_km=args.features_radius_km)
 
-                (profile, prov), cache_meta = await self._cache.get_or_set(key, factory, ttl_s=min(settings.cache_ttl_s, 900))
+                (profile, prov), cache_meta = await self._cached("get_location_profile", key, factory, ttl_s=self._ttl.osm_ttl_s, providers=OSM_PROVIDERS)
+                if profile.location != location:
+                    # Profiles are cached per coordinates; report the entity this call asked about.
+                    profile = profile.model_copy(update={"location": location})
                 if not cache_meta["hit"]:
                     prov.fetched_at_iso = _now_iso()
-                data = {"profile": profile.model_dump()}
+                data = {"profile": profile.model_dump(include=include)}
                 warnings = []
-                if args.location_id and location.name == "Location Anchor":
+                if args.location_id and location.name == SYNTHETIC_ANCHOR_NAME:
                     warnings.append("location_id resolution uses embedded coordinates; name is a synthetic anchor.")
                 return self._ok(data, provenance=prov, cache_meta=cache_meta, warnings=warnings, request_id=request_id)
             except AppError as e:
@@ -145,17 +271,20 @@ class OutdoorIntelligenceServer:
             """Get real-time weather and alerts for a location."""
             request_id = self._new_request_id()
             try:
+                include = include_for(RealTimeConditions, args.detail, args.fields)
                 coords = self._coords_from_input(args.location_id, args.lat, args.lon)
                 key = f"conditions:{coords.lat:.5f}:{coords.lon:.5f}"
                 async def factory():
                     return await self._conditions.real_time(coords.lat, coords.lon)
 
-                (conditions, prov, warnings, _alerts_ok, _alerts_demo), cache_meta = await self._cache.get_or_set(
+                (conditions, prov, warnings, _alerts_ok, _alerts_demo), cache_meta = await self._cached(
+                    "get_real_time_conditions",
                     key,
                     factory,
-                    ttl_s=min(settings.cache_ttl_s, 300),
+                    ttl_s=lambda value: self._ttl.conditions(value[0]),
+                    providers=CONDITIONS_PROVIDERS,
                 )
-                data = {"conditions": conditions.model_dump()}
+                data = {"conditions": conditions.model_dump(include=include)}
                 return self._ok(data, provenance=prov, cache_meta=cache_meta, warnings=warnings, request_id=request_id)
             except AppError as e:
                 return self._err(e, provenance=Provenance(sources=["openweather", "nps_alerts"]), request_id=request_id)
@@ -167,26 +296,28 @@ class OutdoorIntelligenceServer:
             """Compute a deterministic risk score (0-100) with evidence and recommendations."""
             request_id = self._new_request_id()
             try:
+                include = include_for(RiskAssessment, args.detail, args.fields)
                 coords = self._coords_from_input(args.location_id, args.lat, args.lon)
 
                 # gather profile (feature_count) + conditions
                 profile_key = f"profile_count:{coords.lat:.5f}:{coords.lon:.5f}:{args.features_radius_km:.2f}"
                 async def profile_factory():
-                    from .models.location import Location
-                    anchor = Location(id=args.location_id or "anchor", name="Location Anchor", kind="region", center=coords, source="fusion", confidence=0.6)
+                    anchor = self._location_from_input(args.location_id, coords)
                     profile, prov = await self._locations.profile(anchor, features_radius_km=args.features_radius_km)
                     return (len(profile.features), prov)
 
-                (feature_count, prov1), _ = await self._cache.get_or_set(profile_key, profile_factory, ttl_s=min(settings.cache_ttl_s, 900))
+                (feature_count, prov1), _ = await self._cached("risk_and_safety_summary", profile_key, profile_factory, ttl_s=self._ttl.osm_ttl_s, providers=OSM_PROVIDERS)
 
                 cond_key = f"conditions:{coords.lat:.5f}:{coords.lon:.5f}"
                 async def cond_factory():
                     return await self._conditions.real_time(coords.lat, coords.lon)
 
-                (conditions, prov2, warnings, alerts_ok, alerts_demo), cache_meta = await self._cache.get_or_set(
+                (conditions, prov2, warnings, alerts_ok, alerts_demo), cache_meta = await self._cached(
+                    "risk_and_safety_summary",
                     cond_key,
                     cond_factory,
-                    ttl_s=min(settings.cache_ttl_s, 300),
+                    ttl_s=lambda value: self._ttl.conditions(value[0]),
+                    providers=CONDITIONS_PROVIDERS,
                 )
 
                 assessment = self._risk.assess(
@@ -202,13 +333,94 @@ class OutdoorIntelligenceServer:
                     fetched_at_iso=_now_iso(),
                     notes=[],
                 )
-                data = {"risk": assessment.model_dump()}
+                data = {"risk": assessment.model_dump(include=include)}
                 return self._ok(data, provenance=prov, cache_meta=cache_meta, warnings=warnings, request_id=request_id)
             except AppError as e:
                 return self._err(e, provenance=Provenance(sources=["osm_overpass", "openweather", "nps_alerts"]), request_id=request_id)
             except Exception as e:
                 return self._err(AppError(code="internal_error", message="Unhandled error.", details={"where": "risk_and_safety_summary"}, cause=e), provenance=Provenance(sources=["osm_overpass", "openweather", "nps_alerts"]), request_id=request_id)
 
-    async def run(self) -> None:
-        logger.info("starting", server=settings.server_name)
-        await self.mcp.run(transport="stdio")
+        @self.mcp.tool()
+        async def watch_alerts(args: WatchAlertsInput) -> dict[str, Any]:
+            """Poll NPS alerts for a location or park set; pass the returned cursor to get only changes."""
+            request_id = self._new_request_id()
+            try:
+                include = include_for(Alert, args.detail, args.fields)
+                if args.park_codes:
+                    park_codes = args.park_codes
+                else:
+                    coords = self._coords_from_input(args.location_id, args.lat, args.lon)
+                    park_codes = await self._alerts_watch.park_codes_near(coords.lat, coords.lon) if settings.nps_api_key else []
+
+                changes = await self._alerts_watch.changes(park_codes, args.cursor)
+                data = {
+                    "park_codes": changes.park_codes,
+                    "version": changes.version,
+                    "cursor": changes.cursor,
+                    "reset": changes.reset,
+                    "added": [a.model_dump(include=include) for a in changes.added],
+                    "removed": changes.removed,
+                }
+                warnings = [] if settings.nps_api_key else ["alerts_demo_mode"]
+                prov = Provenance(sources=[self._nps.name], fetched_at_iso=_now_iso())
+                return self._ok(data, provenance=prov, warnings=warnings, request_id=request_id)
+            except AppError as e:
+                return self._err(e, provenance=Provenance(sources=["nps_alerts"]), request_id=request_id)
+            except Exception as e:
+                return self._err(AppError(code="internal_error", message="Unhandled error.", details={"where": "watch_alerts"}, cause=e), provenance=Provenance(sources=["nps_alerts"]), request_id=request_id)
+
+    def _register_admin_tools(self) -> None:
+        @self.mcp.tool()
+        async def cache_stats(args: CacheStatsInput) -> dict[str, Any]:
+            """Admin: cache entry counts, estimated memory, hit ratios and ages per key family, plus hottest keys."""
+            request_id = self._new_request_id()
+            data = {
+                "cache": self._cache.stats(top_k=args.top_k),
+                "admission": self._admission.snapshot(),
+                "budgets": self._ctx.budget.snapshot() if self._ctx.budget is not None else {},
+            }
+            return self._ok(data, provenance=Provenance(sources=[], fetched_at_iso=_now_iso()), request_id=request_id)
+
+        @self.mcp.tool()
+        async def diagnostics(args: DiagnosticsInput) -> dict[str, Any]:
+            """Admin: event-loop implementation, loop lag percentiles and recent loop stalls with their stacks."""
+            request_id = self._new_request_id()
+            data = {
+                "pid": os.getpid(),
+                "runtime_mode": settings.runtime_mode,
+                "event_loop": type(asyncio.get_running_loop()).__module__.split(".")[0],
+                "watchdog": self._watchdog.snapshot(include_stacks=args.include_stacks) if self._watchdog is not None else None,
+                "logging": log_stats(),
+            }
+            return self._ok(data, provenance=Provenance(sources=[], fetched_at_iso=_now_iso()), request_id=request_id)
+
+    async def prefetch_catalogs(self) -> dict[str, int]:
+        """Fetch long-lived reference catalogs (NPS parks) into the cache; returns their sizes."""
+        sizes: dict[str, int] = {}
+        if settings.nps_api_key:
+            sizes["nps_parks"] = len(await self._nps.parks())
+        return sizes
+
+    def _warm_targets(self) -> dict[str, list[str]]:
+        targets = {self._overpass.name: settings.overpass_urls or [settings.overpass_url]}
+        if settings.openweather_api_key:
+            targets[self._weather.name] = [settings.openweather_base_url]
+        if settings.nps_api_key:
+            targets[self._nps.name] = [settings.nps_api_base_url]
+        return targets
+
+    async def run(self, sock: socket.socket | None = None) -> None:
+        logger.info("starting", server=settings.server_name, transport=settings.transport, pid=os.getpid())
+        if self._watchdog is not None:
+            self._watchdog.start()
+        if settings.http_warm_on_start:
+            self._ctx.http.start_warming(self._warm_targets(), settings.http_warm_interval_s)
+        if settings.transport == "stdio":
+            await self.mcp.run_stdio_async()
+            return
+
+        import uvicorn
+
+        app = self.mcp.sse_app() if settings.transport == "sse" else self.mcp.streamable_http_app()
+        config = uvicorn.Config(app, host=settings.http_host, port=settings.http_port, log_level=settings.log_level.lower())
+        await uvicorn.Server(config).serve(sockets=[sock] if sock is not None else None)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ..core.cache import TTLCache
+from ..core.exceptions import ValidationError
+from ..core.ttl_policy import TTLPolicy
+from ..models.conditions import Alert
+from ..providers.nps import NPSAlertsProvider
+from ..utils.cursors import decode_cursor, encode_cursor, fingerprint
+
+
+def alert_key(alert: Alert) -> str:
+    if alert.id:
+        return alert.id
+    raw = "\x1f".join([alert.source, alert.park_code or "", alert.title, alert.starts_at_iso or ""])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class AlertsSnapshot:
+    """Current alerts for one park set plus the per-version deltas that led to it."""
+
+    # Identifies this snapshot's version history; a snapshot recreated after eviction (or in
+    # another process) gets a new epoch, so cursors into the old history resync.
+    epoch: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    version: int = 0
+    alerts: dict[str, Alert] = field(default_factory=dict)
+    # version -> (added keys, removed keys) relative to version - 1, oldest first.
+    deltas: OrderedDict[int, tuple[frozenset[str], frozenset[str]]] = field(default_factory=OrderedDict)
+
+
+@dataclass
+class AlertsChanges:
+    park_codes: list[str]
+    version: int
+    cursor: str
+    reset: bool
+    added: list[Alert]
+    removed: list[str]
+
+
+class AlertsWatchService:
+    """Versioned alert snapshots per park set, so pollers receive only what changed.
+
+    Upstream alerts are read through the cache (one fetch per park set per alerts TTL). Each
+    refresh that changes the set of alerts bumps the version and records a delta; a cursor
+    names a snapshot epoch and version, and changes since it come from rewinding the newer
+    deltas. Cursors from another epoch or older than the retained history get a full resync
+    (`reset`).
+    """
+
+    def __init__(
+        self,
+        nps: NPSAlertsProvider,
+        cache: TTLCache,
+        ttl: Optional[TTLPolicy] = None,
+        *,
+        max_sets: int = 1024,
+        history: int = 64,
+    ):
+        self._nps = nps
+        self._cache = cache
+        self._ttl = ttl or TTLPolicy()
+        self._max_sets = max_sets
+        self._history = history
+        self._snapshots: OrderedDict[str, AlertsSnapshot] = OrderedDict()
+
+    async def park_codes_near(self, lat: float, lon: float) -> list[str]:
+        async def factory():
+            return [await self._nps.nearest_park_code(lat, lon)]
+
+        # Park locations are static; cache the resolution like other OSM-scale data.
+        codes, _meta = await self._cache.get_or_set(f"park_code:{lat:.5f}:{lon:.5f}", factory, ttl_s=self._ttl.osm_ttl_s)
+        return codes
+
+    def _snapshot(self, set_key: str) -> AlertsSnapshot:
+        snap = self._snapshots.get(set_key)
+        if snap is None:
+            snap = self._snapshots[set_key] = AlertsSnapshot()
+            while len(self._snapshots) > self._max_sets:
+                self._snapshots.popitem(last=False)
+        self._snapshots.move_to_end(set_key)
+        return snap
+
+    def _apply(self, snap: AlertsSnapshot, alerts: list[Alert]) -> None:
+        current = {alert_key(a): a for a in alerts}
+        added = frozenset(current.keys() - snap.alerts.keys())
+        removed = frozenset(snap.alerts.keys() - current.keys())
+        if snap.version and not added and not removed:
+            return
+        snap.version += 1
+        snap.alerts = current
+        snap.deltas[snap.version] = (added, removed)
+        while len(snap.deltas) > self._history:
+            snap.deltas.popitem(last=False)
+
+    async def changes(self, park_codes: list[str], cursor: Optional[str] = None) -> AlertsChanges:
+        codes = sorted({c.strip().lower() for c in park_codes if c.strip()})
+        set_key = ",".join(codes)
+        payload: Optional[dict[str, Any]] = None
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get("k") != fingerprint(f"alerts:{set_key}") or not isinstance(payload.get("v"), int):
+                raise ValidationError(code="invalid_cursor", message="Cursor does not belong to this park set.")
+
+        async def factory():
+            return await self._nps.get_alerts(codes)
+
+        alerts, _meta = await self._cache.get_or_set(f"alerts_parks:{set_key}", factory, ttl_s=self._ttl.alerts_ttl_s)
+        snap = self._snapshot(set_key)
+        self._apply(snap, alerts)
+        since: Optional[int] = None
+        if payload is not None:
+            # Versions only mean something within one snapshot's history; other epochs resync.
+            since = payload["v"] if payload.get("e") == snap.epoch else -1
+
+        next_cursor = encode_cursor({"k": fingerprint(f"alerts:{set_key}"), "e": snap.epoch, "v": snap.version})
+        oldest = next(iter(snap.deltas), snap.version)
+        if since is None or since > snap.version or since < oldest - 1:
+            # First poll, or a cursor from another process or older than the retained history.
+            return AlertsChanges(codes, snap.version, next_cursor, since is not None, list(snap.alerts.values()), [])
+
+        # Rewind the current set through the newer deltas to what the caller last saw.
+        seen = set(snap.alerts)
+        for version in reversed(snap.deltas):
+            if version <= since:
+                break
+            plus, minus = snap.deltas[version]
+            seen = (seen - plus) | minus
+        return AlertsChanges(
+            codes,
+            snap.version,
+            next_cursor,
+            False,
+            [a for k, a in snap.alerts.items() if k not in seen],
+            sorted(seen - snap.alerts.keys()),
+        )
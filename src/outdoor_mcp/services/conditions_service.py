@@ -1,18 +1,41 @@
 from __future__ import annotations
 
 import datetime as _dt
+from typing import Optional
 from ..providers.openweather import OpenWeatherProvider
 from ..providers.nps import NPSAlertsProvider
 from ..models.conditions import RealTimeConditions
 from ..models.common import Provenance
+from ..core.cache import TTLCache
+from ..core.ttl_policy import TTLPolicy
 from ..core.exceptions import ProviderError
 from ..core.settings import settings
 
 
 class ConditionsService:
-    def __init__(self, weather: OpenWeatherProvider, nps_alerts: NPSAlertsProvider):
+    def __init__(
+        self,
+        weather: OpenWeatherProvider,
+        nps_alerts: NPSAlertsProvider,
+        cache: Optional[TTLCache] = None,
+        ttl: Optional[TTLPolicy] = None,
+    ):
         self._weather = weather
         self._nps = nps_alerts
+        self._cache = cache
+        self._ttl = ttl or TTLPolicy()
+
+    async def _alerts(self, lat: float, lon: float):
+        if self._cache is None:
+            return await self._nps.get_alerts_near(lat=lat, lon=lon)
+
+        # Cached on its own key so NPS failures are negatively cached even though
+        # real_time() degrades them to a warning.
+        async def factory():
+            return await self._nps.get_alerts_near(lat=lat, lon=lon)
+
+        alerts, _meta = await self._cache.get_or_set(f"alerts:{lat:.5f}:{lon:.5f}", factory, ttl_s=self._ttl.alerts_ttl_s)
+        return alerts
 
     async def real_time(self, lat: float, lon: float):
         warnings: list[str] = []
@@ -24,7 +47,7 @@ class ConditionsService:
         alerts_ok = False
         alerts_demo = False
         try:
-            alerts = await self._nps.get_alerts_near(lat=lat, lon=lon)
+            alerts = await self._alerts(lat, lon)
             alerts_ok = True
         except ProviderError as e:
             warnings.append("alerts_unavailable")
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from ..core.logging import get_logger
+from ..core.shared_state import SharedStateStore
+from ..models.location import Location
+
+logger = get_logger(__name__)
+
+
+class LocationRegistry:
+    """LRU map of location id -> Location for every location handed out by search_locations.
+
+    Lets tools resolve a location_id to the real entity (name, kind, OSM identity) without
+    another search. Optionally persisted so ids keep resolving across restarts, off the event
+    loop, by a background task every flush_interval_s while there are changes and once more
+    on close().
+
+    With a shared store, new entries are upserted into its `locations` table and ids missing
+    from memory are looked up there, so every worker resolves ids any worker handed out.
+    Otherwise the whole LRU is written as JSON to `path`, which suits a single process only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        *,
+        path: str = "",
+        flush_interval_s: float = 30.0,
+        shared: Optional[SharedStateStore] = None,
+    ):
+        self._max_entries = max_entries
+        self._shared = shared
+        self._path = "" if shared is not None else path
+        # Entries added since the last flush; only these are written to the shared store.
+        self._pending: dict[str, Location] = {}
+        self._flush_interval_s = flush_interval_s
+        self._entries: OrderedDict[str, Location] = OrderedDict()
+        self._dirty = False
+        self._last_flush = time.time()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        if not self._path or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            for raw in saved[-self._max_entries :]:
+                location = Location.model_validate(raw)
+                self._entries[location.id] = location
+        except (OSError, ValueError) as e:
+            logger.warning("location_registry_unreadable", path=self._path, error=str(e))
+
+    @property
+    def _persistent(self) -> bool:
+        return self._shared is not None or bool(self._path)
+
+    def _write(self, locations: list[Location]) -> bool:
+        if self._shared is not None:
+            rows = [(l.id, json.dumps(l.model_dump())) for l in locations]
+            return self._shared.locations_put(rows, keep=self._max_entries)
+        tmp = f"{self._path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([l.model_dump() for l in locations], f)
+        os.replace(tmp, self._path)
+        return True
+
+    async def flush(self, force: bool = False) -> None:
+        if not self._persistent or not self._dirty:
+            return
+        now = time.time()
+        if not force and now - self._last_flush < self._flush_interval_s:
+            return
+        # Only the snapshot is taken on the loop; serializing and writing run in a worker thread.
+        pending, self._pending = self._pending, {}
+        snapshot = list(pending.values()) if self._shared is not None else list(self._entries.values())
+        self._dirty = False
+        self._last_flush = now
+        async with self._write_lock:
+            error = "shared state store busy"
+            try:
+                written = await asyncio.get_running_loop().run_in_executor(None, self._write, snapshot)
+            except OSError as e:
+                written, error = False, str(e)
+            if not written:
+                # Keep the unwritten entries for the next flush; newer additions win.
+                self._pending = {**pending, **self._pending}
+                self._dirty = True
+                logger.warning("location_registry_write_failed", path=self._shared.path if self._shared is not None else self._path, error=error)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_s)
+            await self.flush()
+
+    def _start_flushing(self) -> None:
+        if self._flush_task is not None or not self._persistent:
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            # No running loop (e.g. synchronous use); close() still writes the file.
+            pass
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush(force=True)
+
+    def add_many(self, locations: Iterable[Location]) -> None:
+        for location in locations:
+            self._entries[location.id] = location
+            self._entries.move_to_end(location.id)
+            if self._shared is not None:
+                self._pending[location.id] = location
+            self._dirty = True
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        if self._dirty:
+            self._start_flushing()
+
+    def get(self, location_id: str) -> Optional[Location]:
+        location = self._entries.get(location_id)
+        if location is not None:
+            self._entries.move_to_end(location_id)
+            return location
+        return self._get_shared(location_id)
+
+    def _get_shared(self, location_id: str) -> Optional[Location]:
+        if self._shared is None:
+            return None
+        raw = self._shared.location_get(location_id)
+        if raw is None:
+            return None
+        try:
+            location = Location.model_validate_json(raw)
+        except ValueError as e:
+            logger.warning("location_registry_unreadable", id=location_id, error=str(e))
+            return None
+        self._entries[location_id] = location
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return location
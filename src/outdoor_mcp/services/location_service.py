@@ -2,24 +2,36 @@ from __future__ import annotations
 
 from typing import Optional
 from ..providers.overpass import OverpassProvider
+from ..providers.osm_extract import OSMExtractProvider
 from ..models.location import LocationProfile
 from ..models.common import Provenance
 
 
 class LocationService:
-    def __init__(self, overpass: OverpassProvider):
+    def __init__(self, overpass: OverpassProvider, extract: Optional[OSMExtractProvider] = None):
         self._overpass = overpass
+        self._extract = extract
+
+    def _osm_for(self, lat: float, lon: float, radius_km: float):
+        # Prefer the offline extract; Overpass remains the fallback outside its extents.
+        if self._extract is not None and self._extract.covers(lat, lon, radius_km):
+            return self._extract
+        return self._overpass
 
     async def search(self, lat: float, lon: float, radius_km: float, query: Optional[str], limit: int = 10):
-        locations = await self._overpass.search_locations(lat=lat, lon=lon, radius_km=radius_km, query=query, limit=limit)
-        prov = Provenance(sources=[self._overpass.name])
+        osm = self._osm_for(lat, lon, radius_km)
+        # Providers return results ranked by relevance-weighted distance, each with distance_km.
+        locations = await osm.search_locations(lat=lat, lon=lon, radius_km=radius_km, query=query, limit=limit)
+        prov = Provenance(sources=[osm.name])
         return locations, prov
 
     async def profile(self, location, features_radius_km: float = 3.0):
-        features = await self._overpass.nearby_features(lat=location.center.lat, lon=location.center.lon, radius_km=features_radius_km)
+        osm = self._osm_for(location.center.lat, location.center.lon, features_radius_km)
+        features = await osm.nearby_features(lat=location.center.lat, lon=location.center.lon, radius_km=features_radius_km)
+        origin = "a local OSM extract" if osm is self._extract else "Overpass"
         summary = {
             "feature_count": str(len(features)),
-            "note": "Features are derived from OpenStreetMap tags via Overpass.",
+            "note": f"Features are derived from OpenStreetMap tags via {origin}.",
         }
-        prov = Provenance(sources=[self._overpass.name])
+        prov = Provenance(sources=[osm.name])
         return LocationProfile(location=location, features=features, summary=summary), prov
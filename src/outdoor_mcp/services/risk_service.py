@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import datetime as _dt
 import math
+from typing import Any
 from ..models.risk import RiskAssessment, RiskBreakdown
 from ..models.conditions import RealTimeConditions
-from ..models.common import Provenance
+from ..models.common import Coordinates
+from ..utils.solar import SunTimes, solar_date, sun_times
 
 
 class RiskService:
@@ -51,20 +53,34 @@ class RiskService:
             return 25
         return 10
 
-    def _daylight_risk(self, when_iso: str | None) -> int:
-        # Without timezone + sunrise API, keep conservative deterministic heuristic.
+    def _parse_when(self, when_iso: str | None) -> _dt.datetime:
         if not when_iso:
-            return 10
+            return _dt.datetime.now(_dt.timezone.utc)
+        dt = _dt.datetime.fromisoformat(when_iso.replace("Z", "+00:00"))
+        # Naive timestamps are interpreted as UTC.
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=_dt.timezone.utc)
+
+    def _daylight_risk(self, when_iso: str | None, at: Coordinates) -> tuple[int, SunTimes | None]:
+        # Sun position is computed locally for the location's own solar day.
+        if not when_iso:
+            return 10, None
         try:
-            dt = _dt.datetime.fromisoformat(when_iso.replace("Z", "+00:00"))
-            hour = dt.hour
+            dt = self._parse_when(when_iso)
         except Exception:
-            return 15
-        if 0 <= hour <= 5:
-            return 55
-        if 6 <= hour <= 7 or 18 <= hour <= 20:
-            return 25
-        return 10
+            return 15, None
+        sun = sun_times(at.lat, at.lon, solar_date(dt, at.lon))
+        return self.daylight_risk_from_sun(dt.timestamp(), sun), sun
+
+    @staticmethod
+    def daylight_risk_from_sun(ts: float, sun: SunTimes) -> int:
+        if sun.polar == "day":
+            return 10
+        if sun.sunrise is not None and sun.sunset is not None and sun.sunrise <= ts <= sun.sunset:
+            # Last hour of daylight: little buffer left before dark.
+            return 20 if sun.sunset - ts < 3600 else 10
+        if sun.civil_dawn is not None and sun.civil_dusk is not None and sun.civil_dawn <= ts <= sun.civil_dusk:
+            return 30
+        return 55
 
     def assess(
         self,
@@ -77,7 +93,7 @@ class RiskService:
         weather = self._weather_risk(conditions)
         alerts = self._alerts_risk(conditions)
         remoteness = self._remoteness_risk(feature_count)
-        daylight = self._daylight_risk(when_iso)
+        daylight, sun = self._daylight_risk(when_iso, conditions.weather.at)
 
         # Weighted score (deterministic)
         score = int(min(100, round(0.45 * weather + 0.25 * alerts + 0.20 * remoteness + 0.10 * daylight)))
@@ -101,12 +117,21 @@ class RiskService:
         elif not alerts_ok:
             uncertainties.append("Alert coverage unavailable (NPS alerts provider failed).")
 
-        evidence = {
+        evidence: dict[str, Any] = {
             "weather": conditions.weather.model_dump(),
             "alerts_count": len(conditions.alerts),
             "feature_count": feature_count,
             "when_iso": when_iso,
         }
+        if sun is not None:
+            sun_evidence: dict[str, str] = {
+                name: _dt.datetime.fromtimestamp(getattr(sun, name), _dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+                for name in ("civil_dawn", "sunrise", "sunset", "civil_dusk")
+                if getattr(sun, name) is not None
+            }
+            if sun.polar:
+                sun_evidence["polar"] = sun.polar
+            evidence["sun"] = sun_evidence
 
         return RiskAssessment(
             risk_score=score,
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import functools
+import types
+from typing import Any, Literal, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from ..core.exceptions import ValidationError
+from ..models.conditions import Alert, RealTimeConditions
+from ..models.location import Location, LocationProfile
+from ..models.risk import RiskAssessment
+
+Detail = Literal["minimal", "standard", "full"]
+
+# Field paths kept by each detail level; "full" keeps everything.
+_PRESETS: dict[type[BaseModel], dict[str, tuple[str, ...]]] = {
+    Location: {
+        "minimal": ("id", "name", "kind", "center", "distance_km"),
+        "standard": ("id", "name", "kind", "center", "distance_km", "confidence", "source"),
+    },
+    LocationProfile: {
+        "minimal": ("location.id", "location.name", "location.kind", "location.center", "summary"),
+        "standard": ("location", "features.kind", "features.name", "features.center", "summary"),
+    },
+    RealTimeConditions: {
+        "minimal": (
+            "weather.observed_at_iso",
+            "weather.temperature_c",
+            "weather.wind_m_s",
+            "weather.precipitation_mm_1h",
+            "weather.description",
+            "alerts.title",
+            "alerts.severity",
+        ),
+        "standard": (
+            "weather",
+            "alerts.source",
+            "alerts.title",
+            "alerts.severity",
+            "alerts.starts_at_iso",
+            "alerts.ends_at_iso",
+        ),
+    },
+    Alert: {
+        "minimal": ("id", "title", "severity"),
+        "standard": ("id", "park_code", "title", "severity", "starts_at_iso", "ends_at_iso"),
+    },
+    RiskAssessment: {
+        "minimal": ("risk_score", "breakdown"),
+        "standard": (
+            "risk_score",
+            "breakdown",
+            "recommendations",
+            "uncertainties",
+            "evidence.alerts_count",
+            "evidence.feature_count",
+            "evidence.when_iso",
+        ),
+    },
+}
+
+
+def _unwrap(annotation: Any) -> tuple[Any, bool]:
+    """Strip Optional[...] and report whether the annotation is a list."""
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return _unwrap(args[0])
+    if origin is list:
+        (inner,) = get_args(annotation) or (Any,)
+        return _unwrap(inner)[0], True
+    return annotation, False
+
+
+def _merge(tree: dict[Any, Any], path: list[str], model: Optional[type[BaseModel]]) -> None:
+    head, rest = path[0], path[1:]
+    inner: Optional[type[BaseModel]] = None
+    if model is not None:
+        field = model.model_fields.get(head)
+        if field is None:
+            raise ValidationError(code="invalid_fields", message=f"Unknown field '{head}' for {model.__name__}.", details={"field": head})
+        annotation, is_list = _unwrap(field.annotation)
+        inner = annotation if isinstance(annotation, type) and issubclass(annotation, BaseModel) else None
+        if is_list and rest:
+            sub = tree.setdefault(head, {})
+            if sub is True:
+                return
+            _merge(sub.setdefault("__all__", {}), rest, inner)
+            return
+    if not rest:
+        tree[head] = True
+        return
+    sub = tree.setdefault(head, {})
+    if sub is True:
+        return
+    _merge(sub, rest, inner)
+
+
+@functools.lru_cache(maxsize=256)
+def _include_tree(model: type[BaseModel], paths: tuple[str, ...]) -> dict[Any, Any]:
+    tree: dict[Any, Any] = {}
+    for path in paths:
+        parts = [p for p in path.split(".") if p]
+        if parts:
+            _merge(tree, parts, model)
+    return tree
+
+
+def include_for(model: type[BaseModel], detail: Detail = "full", fields: Optional[list[str]] = None) -> Optional[dict[Any, Any]]:
+    """Build a `model_dump(include=...)` spec; an explicit field list overrides the detail level."""
+    if fields:
+        return _include_tree(model, tuple(sorted(set(fields))))
+    paths = _PRESETS.get(model, {}).get(detail)
+    if paths is None:
+        return None
+    return _include_tree(model, paths)
+
+
+def project(obj: BaseModel, detail: Detail = "full", fields: Optional[list[str]] = None) -> dict[str, Any]:
+    return obj.model_dump(include=include_for(type(obj), detail, fields))
@@ -3,31 +3,59 @@ from __future__ import annotations
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from .projection import Detail
 
-class SearchLocationsInput(BaseModel):
+
+class ProjectionInput(BaseModel):
+    detail: Detail = Field(default="full", description="Response size: minimal, standard or full")
+    fields: Optional[list[str]] = Field(
+        default=None,
+        max_length=50,
+        description="Explicit dotted field paths to return (e.g. features.name); overrides detail",
+    )
+
+
+class SearchLocationsInput(ProjectionInput):
     lat: float = Field(..., ge=-90, le=90, description="Latitude")
     lon: float = Field(..., ge=-180, le=180, description="Longitude")
     radius_km: float = Field(default=5.0, ge=0.1, le=200, description="Search radius in kilometers")
     query: Optional[str] = Field(default=None, min_length=1, max_length=80, description="Name keyword (regex-like search)")
     limit: int = Field(default=10, ge=1, le=25)
+    cursor: Optional[str] = Field(default=None, max_length=200, description="next_cursor from a previous page of the same search")
 
 
-class GetLocationProfileInput(BaseModel):
+class GetLocationProfileInput(ProjectionInput):
     location_id: Optional[str] = Field(default=None, description="Stable location identifier from search_locations")
     lat: Optional[float] = Field(default=None, ge=-90, le=90)
     lon: Optional[float] = Field(default=None, ge=-180, le=180)
     features_radius_km: float = Field(default=3.0, ge=0.1, le=50)
 
 
-class GetRealTimeConditionsInput(BaseModel):
+class GetRealTimeConditionsInput(ProjectionInput):
     location_id: Optional[str] = None
     lat: Optional[float] = Field(default=None, ge=-90, le=90)
     lon: Optional[float] = Field(default=None, ge=-180, le=180)
 
 
-class RiskAndSafetySummaryInput(BaseModel):
+class RiskAndSafetySummaryInput(ProjectionInput):
     location_id: Optional[str] = None
     lat: Optional[float] = Field(default=None, ge=-90, le=90)
     lon: Optional[float] = Field(default=None, ge=-180, le=180)
     when_iso: Optional[str] = Field(default=None, description="ISO datetime, e.g. 2026-01-03T18:00:00Z")
     features_radius_km: float = Field(default=3.0, ge=0.1, le=50)
+
+
+class WatchAlertsInput(ProjectionInput):
+    location_id: Optional[str] = None
+    lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    lon: Optional[float] = Field(default=None, ge=-180, le=180)
+    park_codes: Optional[list[str]] = Field(default=None, max_length=20, description="NPS park codes; used instead of a location")
+    cursor: Optional[str] = Field(default=None, max_length=200, description="cursor from the previous watch_alerts call")
+
+
+class CacheStatsInput(BaseModel):
+    top_k: int = Field(default=10, ge=1, le=64, description="Number of hottest keys to report")
+
+
+class DiagnosticsInput(BaseModel):
+    include_stacks: bool = Field(default=False, description="Include captured stacks of recent event-loop stalls")
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def bbox_around(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Return (south, west, north, east) of the box enclosing a circle of radius_km."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    coslat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * coslat)))
+    return max(-90.0, lat - dlat), lon - dlon, min(90.0, lat + dlat), lon + dlon
+
+
+def haversine_many(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> list[float]:
+    """Distances from one origin to many points in a single pass, hoisting the origin terms."""
+    lat0 = math.radians(lat)
+    lon0 = math.radians(lon)
+    cos_lat0 = math.cos(lat0)
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    out = []
+    for plat, plon in zip(lats, lons):
+        lat1 = radians(plat)
+        a = sin((lat1 - lat0) / 2) ** 2 + cos_lat0 * cos(lat1) * sin((radians(plon) - lon0) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * asin(sqrt(min(1.0, a))))
+    return out
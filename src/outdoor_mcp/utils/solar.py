@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import datetime as _dt
+import functools
+import math
+from typing import Iterable, NamedTuple, Optional
+
+# Sun altitude (degrees) at sunrise/sunset (refraction + solar radius) and at the end of civil twilight.
+_SUNRISE_ALT = -0.833
+_CIVIL_ALT = -6.0
+_J2000 = 2451545.0
+_UNIX_EPOCH_JD = 2440587.5
+_OBLIQUITY = math.radians(23.4397)
+
+# Memo cell size in degrees; 0.1 deg shifts sunrise by well under a minute.
+CELL_DEG = 0.1
+
+
+class SunTimes(NamedTuple):
+    """UTC epoch seconds of civil dawn, sunrise, sunset and civil dusk for one local solar day.
+
+    Events that do not occur (polar day/night) are None; `polar` is then "day" or "night".
+    """
+
+    civil_dawn: Optional[float]
+    sunrise: Optional[float]
+    sunset: Optional[float]
+    civil_dusk: Optional[float]
+    polar: Optional[str] = None
+
+
+class _DayTerms(NamedTuple):
+    j_star: float
+    transit: float
+    sin_decl: float
+    cos_decl: float
+
+
+def _day_terms(day_number: int, lon: float) -> _DayTerms:
+    j_star = day_number - lon / 360.0
+    m = math.radians((357.5291 + 0.98560028 * j_star) % 360.0)
+    c = 1.9148 * math.sin(m) + 0.0200 * math.sin(2 * m) + 0.0003 * math.sin(3 * m)
+    ecl_lon = math.radians((math.degrees(m) + c + 180.0 + 102.9372) % 360.0)
+    transit = _J2000 + j_star + 0.0053 * math.sin(m) - 0.0069 * math.sin(2 * ecl_lon)
+    sin_decl = math.sin(ecl_lon) * math.sin(_OBLIQUITY)
+    return _DayTerms(j_star, transit, sin_decl, math.cos(math.asin(sin_decl)))
+
+
+def _hour_angle(lat_rad: float, terms: _DayTerms, altitude_deg: float) -> Optional[float]:
+    """Hour angle in days, or +inf/-inf when the sun never crosses the altitude."""
+    denom = math.cos(lat_rad) * terms.cos_decl
+    if abs(denom) < 1e-12:
+        return None
+    cos_w = (math.sin(math.radians(altitude_deg)) - math.sin(lat_rad) * terms.sin_decl) / denom
+    if cos_w < -1.0:
+        return math.inf
+    if cos_w > 1.0:
+        return -math.inf
+    return math.degrees(math.acos(cos_w)) / 360.0
+
+
+def _to_epoch(jd: float) -> float:
+    return (jd - _UNIX_EPOCH_JD) * 86400.0
+
+
+def _events(lat: float, terms: _DayTerms) -> SunTimes:
+    lat_rad = math.radians(lat)
+    rise = _hour_angle(lat_rad, terms, _SUNRISE_ALT)
+    civil = _hour_angle(lat_rad, terms, _CIVIL_ALT)
+    if rise is None or civil is None:
+        return SunTimes(None, None, None, None, polar="day" if lat * terms.sin_decl > 0 else "night")
+
+    def pair(w: float) -> tuple[Optional[float], Optional[float]]:
+        if math.isinf(w):
+            return None, None
+        return _to_epoch(terms.transit - w), _to_epoch(terms.transit + w)
+
+    civil_dawn, civil_dusk = pair(civil)
+    sunrise, sunset = pair(rise)
+    polar = None
+    if math.isinf(rise):
+        polar = "day" if rise > 0 else "night"
+    return SunTimes(civil_dawn, sunrise, sunset, civil_dusk, polar)
+
+
+def _day_number(date: _dt.date) -> int:
+    # Days since J2000 at local solar noon of `date`.
+    return date.toordinal() - _dt.date(2000, 1, 1).toordinal()
+
+
+def solar_date(when: _dt.datetime, lon: float) -> _dt.date:
+    """Calendar date at the location, using mean solar time (UTC + lon/15 hours)."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=_dt.timezone.utc)
+    return (when.astimezone(_dt.timezone.utc) + _dt.timedelta(hours=lon / 15.0)).date()
+
+
+def _cell(value: float) -> int:
+    return int(round(value / CELL_DEG))
+
+
+@functools.lru_cache(maxsize=16384)
+def _sun_times_cell(lat_cell: int, lon_cell: int, ordinal: int) -> SunTimes:
+    lat, lon = lat_cell * CELL_DEG, lon_cell * CELL_DEG
+    return _events(lat, _day_terms(_day_number(_dt.date.fromordinal(ordinal)), lon))
+
+
+def sun_times(lat: float, lon: float, date: _dt.date) -> SunTimes:
+    """Sunrise/sunset and civil twilight, memoized per (0.1 deg cell, date)."""
+    return _sun_times_cell(_cell(lat), _cell(lon), date.toordinal())
+
+
+def sun_times_many(points: Iterable[tuple[float, float]], date: _dt.date) -> list[SunTimes]:
+    """Batch variant for scoring many points on one date.
+
+    Points are collapsed to memo cells first; the orbital terms are computed once per
+    distinct longitude cell and shared by every latitude in it.
+    """
+    day_number = _day_number(date)
+    cells = [(_cell(lat), _cell(lon)) for lat, lon in points]
+    terms_by_lon: dict[int, _DayTerms] = {}
+    resolved: dict[tuple[int, int], SunTimes] = {}
+    for lat_cell, lon_cell in dict.fromkeys(cells):
+        terms = terms_by_lon.get(lon_cell)
+        if terms is None:
+            terms = terms_by_lon[lon_cell] = _day_terms(day_number, lon_cell * CELL_DEG)
+        resolved[(lat_cell, lon_cell)] = _events(lat_cell * CELL_DEG, terms)
+    return [resolved[c] for c in cells]
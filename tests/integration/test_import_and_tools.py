@@ -10,3 +10,116 @@ async def test_import_server():
         assert srv.mcp is not None
     finally:
         await srv.close()
+
+
+@pytest.mark.asyncio
+async def test_search_pages_from_one_cached_result_set():
+    from outdoor_mcp.models.common import Coordinates, Provenance
+    from outdoor_mcp.models.location import Location
+    from outdoor_mcp.server import OutdoorIntelligenceServer
+
+    srv = OutdoorIntelligenceServer()
+    calls = {"n": 0}
+
+    async def fake_search(lat, lon, radius_km, query, limit=10):
+        calls["n"] += 1
+        locs = [Location(id=f"osm:node:{i}:0:0", name=f"L{i}", center=Coordinates(lat=0, lon=0)) for i in range(30)]
+        return locs, Provenance(sources=["osm_overpass"])
+
+    srv._locations.search = fake_search
+    try:
+        args = {"lat": 0.0, "lon": 0.0, "radius_km": 5.0, "limit": 20}
+        _, first = await srv.mcp.call_tool("search_locations", {"args": args})
+        cursor = first["data"]["next_cursor"]
+        _, second = await srv.mcp.call_tool("search_locations", {"args": {**args, "cursor": cursor}})
+    finally:
+        await srv.close()
+
+    assert calls["n"] == 1
+    assert len(first["data"]["locations"]) == 20
+    assert [l["name"] for l in second["data"]["locations"]] == [f"L{i}" for i in range(20, 30)]
+    assert second["data"]["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_fields_are_rejected_before_fetching():
+    from outdoor_mcp.server import OutdoorIntelligenceServer
+
+    srv = OutdoorIntelligenceServer()
+    calls = {"n": 0}
+
+    async def fake_search(lat, lon, radius_km, query, limit=10):
+        calls["n"] += 1
+        raise AssertionError("provider must not be called")
+
+    srv._locations.search = fake_search
+    try:
+        args = {"lat": 0.0, "lon": 0.0, "radius_km": 5.0, "fields": ["nope"]}
+        _, out = await srv.mcp.call_tool("search_locations", {"args": args})
+    finally:
+        await srv.close()
+
+    assert out["error"]["code"] == "invalid_fields"
+    assert calls["n"] == 0
+
+
+@pytest.mark.asyncio
+async def test_location_id_resolves_to_searched_entity():
+    from outdoor_mcp.models.common import Coordinates, Provenance
+    from outdoor_mcp.models.location import Location, LocationProfile
+    from outdoor_mcp.server import OutdoorIntelligenceServer
+
+    srv = OutdoorIntelligenceServer()
+    trail = Location(
+        id="osm:way:42:44.1:-110.2", name="Ridge Trail", kind="trail", center=Coordinates(lat=44.1, lon=-110.2), distance_km=1.5
+    )
+
+    async def fake_search(lat, lon, radius_km, query, limit=10):
+        return [trail], Provenance(sources=["osm_overpass"])
+
+    async def fake_profile(location, features_radius_km=3.0):
+        return LocationProfile(location=location), Provenance(sources=["osm_overpass"])
+
+    srv._locations.search = fake_search
+    srv._locations.profile = fake_profile
+    try:
+        await srv.mcp.call_tool("search_locations", {"args": {"lat": 44.1, "lon": -110.2, "radius_km": 5.0}})
+        _, out = await srv.mcp.call_tool("get_location_profile", {"args": {"location_id": trail.id}})
+    finally:
+        await srv.close()
+
+    assert out["data"]["profile"]["location"]["name"] == "Ridge Trail"
+    assert out["data"]["profile"]["location"]["kind"] == "trail"
+    # The distance belonged to the search that found the trail, not to this profile.
+    assert out["data"]["profile"]["location"].get("distance_km") is None
+    assert out["warnings"] == []
+
+
+@pytest.mark.asyncio
+async def test_negatively_cached_quota_exhaustion_serves_stale():
+    import time
+
+    from outdoor_mcp.core.exceptions import ProviderError
+    from outdoor_mcp.server import OutdoorIntelligenceServer
+
+    srv = OutdoorIntelligenceServer()
+    srv._cache._stale_grace_s = 600
+    srv._cache._negative_ttls = {"quota_exhausted": 60}
+    calls = {"n": 0}
+
+    async def factory():
+        calls["n"] += 1
+        raise ProviderError(code="quota_exhausted", message="budget used up")
+
+    try:
+        srv._cache.set("k", {"v": 1}, ttl_s=60)
+        srv._cache._store["k"].expires_at = time.time() - 1
+        first, _ = await srv._cached("tool", "k", factory, 60)
+        # The failure is now negatively cached; later calls must still fall back to stale data.
+        second, meta = await srv._cached("tool", "k", factory, 60)
+    finally:
+        await srv.close()
+
+    assert first == second == {"v": 1}
+    assert meta["stale"] is True
+    assert calls["n"] == 1
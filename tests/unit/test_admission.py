@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from outdoor_mcp.core.admission import AdmissionController
+from outdoor_mcp.core.exceptions import OverloadedError
+
+
+@pytest.mark.asyncio
+async def test_rejects_immediately_when_queue_is_full():
+    ctl = AdmissionController(max_concurrency=1, tool_max_concurrency=1, max_queue=0, max_wait_s=5.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with ctl.admit("search_locations"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    with pytest.raises(OverloadedError) as exc:
+        async with ctl.admit("search_locations"):
+            pass
+    release.set()
+    await holder
+
+    assert exc.value.details["reason"] == "queue_full"
+    assert ctl.snapshot()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_waiting_request_is_admitted_when_slot_frees():
+    ctl = AdmissionController(max_concurrency=1, tool_max_concurrency=1, max_queue=4, max_wait_s=1.0)
+    order = []
+
+    async def work(name):
+        async with ctl.admit("get_location_profile"):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(work("a"), work("b"))
+
+    assert order == ["a", "b"]
+    assert ctl.snapshot()["admitted"] == 2
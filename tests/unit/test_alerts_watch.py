@@ -0,0 +1,131 @@
+import pytest
+
+from outdoor_mcp.core.cache import TTLCache
+from outdoor_mcp.core.exceptions import ValidationError
+from outdoor_mcp.models.conditions import Alert
+from outdoor_mcp.services.alerts_watch import AlertsWatchService
+
+
+class FakeNPS:
+    name = "nps_alerts"
+
+    def __init__(self):
+        self.alerts = []
+        self.calls = 0
+
+    async def get_alerts(self, park_codes):
+        self.calls += 1
+        return list(self.alerts)
+
+
+def _alert(i: int) -> Alert:
+    return Alert(id=f"a{i}", park_code="yell", source="nps", title=f"Alert {i}")
+
+
+@pytest.mark.asyncio
+async def test_cursor_returns_only_changes():
+    nps = FakeNPS()
+    cache = TTLCache(300)
+    watch = AlertsWatchService(nps, cache)
+    nps.alerts = [_alert(1), _alert(2)]
+
+    first = await watch.changes(["YELL"])
+    assert [a.id for a in first.added] == ["a1", "a2"]
+
+    unchanged = await watch.changes(["yell"], first.cursor)
+    assert unchanged.added == [] and unchanged.removed == []
+    assert nps.calls == 1
+
+    nps.alerts = [_alert(2), _alert(3)]
+    cache._store.clear()
+    changed = await watch.changes(["yell"], first.cursor)
+    assert [a.id for a in changed.added] == ["a3"]
+    assert changed.removed == ["a1"]
+    assert changed.version == first.version + 1
+
+
+@pytest.mark.asyncio
+async def test_cursor_for_other_park_set_is_rejected():
+    watch = AlertsWatchService(FakeNPS(), TTLCache(300))
+    first = await watch.changes(["yell"])
+    with pytest.raises(ValidationError):
+        await watch.changes(["grca"], first.cursor)
+
+
+@pytest.mark.asyncio
+async def test_cursor_into_an_evicted_snapshot_resyncs():
+    nps = FakeNPS()
+    cache = TTLCache(300)
+    watch = AlertsWatchService(nps, cache, max_sets=1)
+    nps.alerts = [_alert(1)]
+    old = await watch.changes(["yell"])
+
+    await watch.changes(["grca"])  # evicts the yell snapshot
+    for alerts in ([_alert(2)], [_alert(3)]):
+        nps.alerts = alerts
+        cache._store.clear()
+        recreated = await watch.changes(["yell"])
+    assert recreated.version >= old.version
+
+    resumed = await watch.changes(["yell"], old.cursor)
+    assert resumed.reset is True
+    assert [a.id for a in resumed.added] == ["a3"]
+
+
+@pytest.mark.asyncio
+async def test_nearest_park_code_reads_one_cached_catalog(monkeypatch):
+    import httpx
+
+    from outdoor_mcp.core.http import HttpClient
+    from outdoor_mcp.core.rate_limiter import RateLimiter
+    from outdoor_mcp.core.settings import settings
+    from outdoor_mcp.providers.base import ProviderContext
+    from outdoor_mcp.providers.nps import NPSAlertsProvider
+
+    monkeypatch.setattr(settings, "nps_parks_page_size", 2)
+    parks = [
+        {"parkCode": "yell", "latitude": "44.6", "longitude": "-110.5"},
+        {"parkCode": "grte", "latitude": "43.8", "longitude": "-110.7"},
+        {"parkCode": "glac", "latitude": "48.7", "longitude": "-113.8"},
+    ]
+    pages = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["start"])
+        pages.append(start)
+        return httpx.Response(200, json={"data": parks[start : start + 2]})
+
+    http = HttpClient()
+    http._clients["nps_alerts"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    nps = NPSAlertsProvider(ProviderContext(http, RateLimiter(100)), cache=TTLCache(300))
+    try:
+        assert await nps.nearest_park_code(48.5, -113.9) == "glac"
+        assert await nps.nearest_park_code(43.7, -110.7) == "grte"
+    finally:
+        await http.close()
+
+    assert pages == [0, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_empty_park_catalog_is_not_cached():
+    import httpx
+
+    from outdoor_mcp.core.exceptions import ProviderError
+    from outdoor_mcp.core.http import HttpClient
+    from outdoor_mcp.core.rate_limiter import RateLimiter
+    from outdoor_mcp.providers.base import ProviderContext
+    from outdoor_mcp.providers.nps import PARKS_CATALOG_KEY, NPSAlertsProvider
+
+    http = HttpClient()
+    http._clients["nps_alerts"] = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json={"data": []})))
+    cache = TTLCache(300)
+    nps = NPSAlertsProvider(ProviderContext(http, RateLimiter(100)), cache=cache)
+    try:
+        with pytest.raises(ProviderError) as err:
+            await nps.nearest_park_code(44.6, -110.5)
+    finally:
+        await http.close()
+
+    assert err.value.code == "nps_no_parks"
+    assert cache.get(PARKS_CATALOG_KEY) is None
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from outdoor_mcp.core.budget import ProviderBudget, background_priority
+from outdoor_mcp.core.cache import TTLCache
+from outdoor_mcp.core.exceptions import ProviderError
+
+
+def test_spend_raises_quota_exhausted_when_window_is_used_up():
+    budget = ProviderBudget({"openweather": {"limit": 2, "window_s": 3600}})
+    budget.spend("openweather")
+    budget.spend("openweather")
+    with pytest.raises(ProviderError) as exc:
+        budget.spend("openweather")
+    assert exc.value.code == "quota_exhausted"
+    # Unbudgeted providers are never limited.
+    budget.spend("nps_alerts")
+
+
+def test_background_work_is_deferred_below_low_watermark():
+    budget = ProviderBudget({"openweather": {"limit": 10, "window_s": 3600}}, low_watermark=0.5)
+    for _ in range(6):
+        budget.spend("openweather")
+    assert budget.is_low(["openweather"])
+    assert budget.ttl_multiplier(["openweather"]) > 1.0
+    with background_priority():
+        with pytest.raises(ProviderError):
+            budget.spend("openweather")
+    budget.spend("openweather")
+
+
+def test_usage_survives_restart(tmp_path):
+    path = str(tmp_path / "budgets.json")
+    budget = ProviderBudget({"openweather": {"limit": 5, "window_s": 3600}}, state_path=path)
+    budget.spend("openweather")
+    budget.spend("openweather")
+    budget.flush(force=True)
+
+    reloaded = ProviderBudget({"openweather": {"limit": 5, "window_s": 3600}}, state_path=path)
+    assert reloaded.snapshot()["openweather"]["used"] == 2
+
+
+def test_expired_entries_are_served_stale_within_grace():
+    cache = TTLCache(60, stale_grace_s=600)
+    cache.set("k", {"v": 1}, ttl_s=60)
+    cache._store["k"].expires_at = time.time() - 1
+
+    assert cache.get("k") is None
+    value, meta = cache.get_stale("k")
+    assert value == {"v": 1}
+    assert meta["stale"] is True
+
+
+def test_shared_budget_is_global_across_workers(tmp_path):
+    from outdoor_mcp.core.shared_state import SharedStateStore
+
+    path = str(tmp_path / "shared.sqlite3")
+    limits = {"openweather": {"limit": 3, "window_s": 3600}}
+    a = ProviderBudget(limits, shared=SharedStateStore(path))
+    b = ProviderBudget(limits, shared=SharedStateStore(path))
+
+    a.spend("openweather")
+    b.spend("openweather")
+    a.spend("openweather")
+    with pytest.raises(ProviderError):
+        b.spend("openweather")
+    assert a.snapshot()["openweather"]["used"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_calls_and_retries_are_accounted_correctly(monkeypatch):
+    import httpx
+
+    from outdoor_mcp.core.exceptions import RateLimitError
+    from outdoor_mcp.core.http import HttpClient
+    from outdoor_mcp.core.rate_limiter import RateLimiter
+    from outdoor_mcp.core.settings import settings
+    from outdoor_mcp.providers.base import ProviderContext
+
+    monkeypatch.setattr(settings, "rate_limit_max_wait_s", 0.0)
+    monkeypatch.setattr(settings, "http_max_retries", 2)
+    monkeypatch.setattr(settings, "http_retry_backoff_s", 0.0)
+    budget = ProviderBudget({"openweather": {"limit": 10, "window_s": 3600}})
+    ctx = ProviderContext(HttpClient(), RateLimiter(0.001, capacity=1), budget=budget)
+    statuses = iter([503, 503, 200])
+    ctx.http._clients["openweather"] = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(next(statuses))))
+    try:
+        await ctx.acquire("openweather")
+        with pytest.raises(RateLimitError):
+            await ctx.acquire("openweather")
+        assert budget.snapshot()["openweather"]["used"] == 1
+
+        resp = await ctx.http.request("GET", "https://example.test/", provider="openweather")
+    finally:
+        await ctx.close()
+
+    assert resp.status_code == 200
+    # The first attempt was paid for by acquire(); the two retries are debited on their own.
+    assert budget.snapshot()["openweather"]["used"] == 3
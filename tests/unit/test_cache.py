@@ -1,4 +1,5 @@
 import asyncio
+import time
 import pytest
 from outdoor_mcp.core.cache import TTLCache
 
@@ -20,3 +21,130 @@ async def test_cache_get_or_set_hits():
     assert calls["n"] == 1
     assert meta1["hit"] is False
     assert meta2["hit"] is True
+
+
+@pytest.mark.asyncio
+async def test_cache_negative_entries_short_circuit_failing_factory():
+    from outdoor_mcp.core.exceptions import ProviderError
+
+    cache = TTLCache(default_ttl_s=10, negative_ttls={"nps_http_error": 30})
+    calls = {"n": 0}
+
+    async def factory():
+        calls["n"] += 1
+        raise ProviderError(code="nps_http_error", message="down")
+
+    for _ in range(3):
+        with pytest.raises(ProviderError) as exc:
+            await cache.get_or_set("k", factory)
+
+    assert calls["n"] == 1
+    assert exc.value.details["negative_cache"] is True
+    assert cache.negative_size == 1
+    assert cache.get("k") is None
+
+
+def test_cache_negative_ttl_grows_per_consecutive_failure():
+    from outdoor_mcp.core.exceptions import ProviderError
+
+    cache = TTLCache(default_ttl_s=10, negative_ttls={"overpass_http_error": 10}, negative_max_ttl_s=25)
+    err = ProviderError(code="overpass_http_error", message="down")
+
+    first = cache.set_negative("k", err)
+    first.expires_at = time.time() - 1  # expired, but still within the streak window
+    second = cache.set_negative("k", err)
+    second.expires_at = time.time() - 1
+    third = cache.set_negative("k", err)
+
+    assert (first.failures, second.failures, third.failures) == (1, 2, 3)
+    assert third.expires_at - time.time() == pytest.approx(25, abs=1)
+    assert cache.set_negative("k", ProviderError(code="rate_limited", message="x")) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_by_family():
+    cache = TTLCache(default_ttl_s=10)
+
+    async def factory():
+        return {"x": "y" * 100}
+
+    for _ in range(3):
+        await cache.get_or_set("search:1", factory)
+    await cache.get_or_set("profile:1", factory)
+
+    stats = cache.stats(top_k=1)
+
+    assert stats["families"]["search"]["entries"] == 1
+    assert stats["families"]["search"]["hits"] == 2
+    assert stats["families"]["search"]["misses"] == 1
+    assert stats["families"]["profile"]["age_histogram"]["<1m"] == 1
+    assert stats["families"]["profile"]["bytes_estimate"] > 100
+    assert stats["top_keys"] == [{"key": "search:1", "hits": 2}]
+
+
+@pytest.mark.asyncio
+async def test_cache_compresses_large_values_and_keeps_hot_set_decoded():
+    cache = TTLCache(default_ttl_s=10, compress_min_bytes=1024, hot_set_size=1)
+    big = {"tags": ["alpine meadow"] * 500}
+
+    async def factory():
+        return big
+
+    await cache.get_or_set("profile:a", factory)
+    await cache.get_or_set("profile:b", factory)
+    entry = cache.get("profile:a")
+    value, meta = await cache.get_or_set("profile:a", factory)
+
+    assert entry.compressed is True
+    assert entry.size_bytes < 1024
+    assert meta["hit"] is True
+    assert value == big
+
+
+@pytest.mark.asyncio
+async def test_fill_survives_cancellation_of_the_first_caller():
+    cache = TTLCache(60)
+    release = asyncio.Event()
+    calls = {"n": 0}
+
+    async def factory():
+        calls["n"] += 1
+        await release.wait()
+        return "fresh"
+
+    leader = asyncio.create_task(cache.get_or_set("profile:x", factory))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(cache.get_or_set("profile:x", factory)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    release.set()
+    results = await asyncio.gather(*followers)
+
+    assert calls["n"] == 1
+    assert [value for value, _meta in results] == ["fresh"] * 3
+    assert cache.get("profile:x") is not None
+    flights = cache.stats()["singleflight"]
+    assert flights["started"] == 1 and flights["joined"] == 3
+    assert flights["max_waiters"] == 4
+    assert flights["dedup_ratio"] == 0.75
+
+
+def test_small_values_are_not_pickled_and_shared_blobs_are_not_repickled(tmp_path, monkeypatch):
+    from outdoor_mcp.core import cache as cache_module
+    from outdoor_mcp.core.shared_state import SharedStateStore
+
+    encoded = []
+    real_encode = cache_module._encode
+    monkeypatch.setattr(cache_module, "_encode", lambda value: encoded.append(value) or real_encode(value))
+
+    local = TTLCache(default_ttl_s=10, compress_min_bytes=1024)
+    local.set("small", {"x": 1})
+    assert encoded == []
+
+    path = str(tmp_path / "shared.sqlite3")
+    writer = TTLCache(default_ttl_s=10, shared=SharedStateStore(path))
+    writer.set("k", {"x": 1})
+    assert len(encoded) == 1
+    reader = TTLCache(default_ttl_s=10, shared=SharedStateStore(path), compress_min_bytes=1024)
+    assert reader.get("k").value == {"x": 1}
+    assert len(encoded) == 1
@@ -0,0 +1,64 @@
+import httpx
+import pytest
+
+from outdoor_mcp.core.http import HttpClient
+
+
+@pytest.mark.asyncio
+async def test_request_cached_revalidates_with_etag():
+    seen_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"data": [1, 2]}, headers={"ETag": '"v1"'})
+
+    parses = {"n": 0}
+
+    def parse(resp: httpx.Response):
+        parses["n"] += 1
+        return resp.json()["data"]
+
+    http = HttpClient()
+    http._clients["default"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        first = await http.request_cached("GET", "https://example.test/parks", parse=parse, params={"start": 0})
+        second = await http.request_cached("GET", "https://example.test/parks", parse=parse, params={"start": 0})
+    finally:
+        await http.close()
+
+    assert first == second == [1, 2]
+    assert seen_headers == [None, '"v1"']
+    assert parses["n"] == 1
+    assert http.revalidated == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_opens_origin_and_skips_recently_used_pools():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, str(request.url)))
+        return httpx.Response(200)
+
+    http = HttpClient()
+    for provider in ("osm_overpass", "nps_alerts"):
+        http._clients[provider] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    targets = {
+        "osm_overpass": ["https://a.test/api/interpreter", "https://b.test/api/interpreter"],
+        "nps_alerts": ["https://nps.test/api/v1"],
+    }
+    try:
+        await http.warm(targets)
+        assert sorted(seen) == [("HEAD", "https://a.test/"), ("HEAD", "https://b.test/"), ("HEAD", "https://nps.test/")]
+
+        seen.clear()
+        await http.request("GET", "https://nps.test/api/v1/alerts", provider="nps_alerts")
+        seen.clear()
+        await http.warm(targets, idle_s=60)
+    finally:
+        await http.close()
+
+    assert all("nps.test" not in url for _, url in seen)
+    assert len(seen) == 2
@@ -0,0 +1,63 @@
+import os
+
+from outdoor_mcp.models.common import Coordinates
+from outdoor_mcp.models.location import Location
+from outdoor_mcp.services.location_registry import LocationRegistry
+
+
+def _loc(i: int) -> Location:
+    return Location(id=f"osm:node:{i}:1.0:2.0", name=f"L{i}", center=Coordinates(lat=1.0, lon=2.0))
+
+
+def test_least_recently_used_locations_are_evicted():
+    registry = LocationRegistry(max_entries=2)
+    registry.add_many([_loc(1), _loc(2)])
+    assert registry.get(_loc(1).id) is not None
+    registry.add_many([_loc(3)])
+
+    assert registry.get(_loc(2).id) is None
+    assert registry.get(_loc(1).id).name == "L1"
+    assert len(registry) == 2
+
+
+async def test_registry_is_reloaded_from_disk(tmp_path):
+    path = str(tmp_path / "locations.json")
+    registry = LocationRegistry(path=path)
+    registry.add_many([_loc(7)])
+    assert not os.path.exists(path)
+    await registry.close()
+
+    assert LocationRegistry(path=path).get(_loc(7).id) == _loc(7)
+
+
+async def test_registry_is_written_in_the_background(tmp_path):
+    import asyncio
+
+    path = str(tmp_path / "locations.json")
+    registry = LocationRegistry(path=path, flush_interval_s=0.01)
+    registry.add_many([_loc(1)])
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        await asyncio.sleep(0.01)
+    await registry.close()
+
+    assert LocationRegistry(path=path).get(_loc(1).id) == _loc(1)
+
+
+async def test_workers_share_the_registry_through_the_store(tmp_path):
+    from outdoor_mcp.core.shared_state import SharedStateStore
+
+    path = str(tmp_path / "shared.sqlite3")
+    a = LocationRegistry(max_entries=2, shared=SharedStateStore(path))
+    b = LocationRegistry(max_entries=2, shared=SharedStateStore(path))
+    a.add_many([_loc(1)])
+    b.add_many([_loc(2), _loc(3)])
+    await a.close()
+    await b.close()
+
+    fresh = LocationRegistry(max_entries=2, shared=SharedStateStore(path))
+    # Both workers' entries survive; the table keeps the newest max_entries ids.
+    assert fresh.get(_loc(3).id) == _loc(3)
+    assert fresh.get(_loc(2).id) == _loc(2)
+    assert fresh.get(_loc(1).id) is None
@@ -0,0 +1,44 @@
+import io
+import threading
+
+import pytest
+import structlog
+
+from outdoor_mcp.core.logging import EventSampler, LogPipeline
+
+
+def test_pipeline_drops_and_counts_lines_when_writer_falls_behind():
+    stream = io.StringIO()
+    release = threading.Event()
+
+    def slow_render(logger, name, event_dict):
+        release.wait()
+        return event_dict["event"]
+
+    pipeline = LogPipeline(slow_render, stream, max_queue=4, batch_size=8)
+    for i in range(50):
+        pipeline.put({"event": f"e{i}"})
+    release.set()
+    pipeline.close()
+
+    lines = stream.getvalue().splitlines()
+    assert pipeline.dropped >= 40
+    assert "e0" in lines
+    assert pipeline.written + pipeline.dropped == 50 + 1  # +1 for the dropped-lines notice
+
+
+def test_sampler_caps_events_per_second():
+    sampler = EventSampler({"noisy_sampled": 0.0}, {"noisy_capped": 3})
+    kept = 0
+    for _ in range(10):
+        try:
+            sampler(None, "info", {"event": "noisy_capped"})
+            kept += 1
+        except structlog.DropEvent:
+            pass
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "noisy_sampled"})
+    sampler(None, "info", {"event": "other"})
+
+    assert kept == 3
+    assert sampler.dropped == 8
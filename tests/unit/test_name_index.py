@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from outdoor_mcp.core.rate_limiter import RateLimiter
+from outdoor_mcp.providers.base import ProviderContext
+from outdoor_mcp.providers.name_index import NameIndex, normalize_name
+from outdoor_mcp.providers.overpass import OverpassProvider
+
+ELEMENTS = [
+    {"type": "node", "id": 1, "lat": 45.001, "lon": 6.0, "tags": {"name": "Côte Rôtie"}},
+    {"type": "node", "id": 2, "lat": 45.010, "lon": 6.0, "tags": {"name": "Cote"}},
+    {"type": "node", "id": 3, "lat": 45.002, "lon": 6.0, "tags": {"name": "La Côte Sauvage"}},
+    {"type": "node", "id": 4, "lat": 45.003, "lon": 6.0, "tags": {"name": "Refuge du Lac"}},
+]
+
+
+class FakeHttp:
+    def __init__(self):
+        self.queries: list[str] = []
+
+    async def request(self, method, url, *, data=None, **kwargs):
+        self.queries.append(data["data"])
+        return httpx.Response(200, json={"elements": ELEMENTS})
+
+    async def request_cached(self, method, url, *, parse, **kwargs):
+        return parse(await self.request(method, url, **kwargs))
+
+    async def close(self):
+        pass
+
+
+def test_normalize_folds_diacritics_and_punctuation():
+    assert normalize_name("Côte-d'Or") == "cote d or"
+
+
+def test_search_ranks_by_match_quality_then_distance():
+    index = NameIndex(ttl_s=60, max_elements=100)
+    index.add_area(45.0, 6.0, 5.0, ELEMENTS)
+
+    names = [el["tags"]["name"] for el in index.search(45.0, 6.0, 5.0, "cote", limit=10)]
+
+    assert names == ["Cote", "Côte Rôtie", "La Côte Sauvage"]
+    assert index.covers(45.001, 6.001, 1.0)
+    assert not index.covers(45.0, 6.0, 6.0)
+
+
+def test_short_queries_use_postings():
+    index = NameIndex(ttl_s=60, max_elements=100)
+    index.add_area(45.0, 6.0, 5.0, ELEMENTS)
+
+    assert index._candidates("la") == {2, 3}
+    assert [el["id"] for el in index.search(45.0, 6.0, 5.0, "la", limit=10)] == [3, 4]
+
+
+def test_expired_area_drops_only_its_own_elements(monkeypatch):
+    import outdoor_mcp.providers.name_index as mod
+
+    now = [1000.0]
+    monkeypatch.setattr(mod.time, "time", lambda: now[0])
+    index = NameIndex(ttl_s=60, max_elements=100)
+    index.add_area(45.0, 6.0, 5.0, ELEMENTS[:2])
+    now[0] += 30
+    index.add_area(45.0, 6.0, 5.0, ELEMENTS[1:])
+    now[0] += 40
+
+    assert index.covers(45.0, 6.0, 1.0)
+    # The first area expired; the element both areas share stays, its own does not.
+    assert len(index) == 3
+    assert [el["id"] for el in index.search(45.0, 6.0, 5.0, "cote", limit=10)] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_repeated_text_queries_hit_upstream_once():
+    http = FakeHttp()
+    provider = OverpassProvider(ProviderContext(http=http, limiter=RateLimiter(100)))
+
+    first = await provider.search_locations(45.0, 6.0, radius_km=2, query="Côte")
+    second = await provider.search_locations(45.001, 6.0, radius_km=2, query="refuge")
+
+    assert len(http.queries) == 1
+    assert "name~" not in http.queries[0]
+    assert [loc.name for loc in first] == ["Cote", "Côte Rôtie", "La Côte Sauvage"]
+    assert [loc.name for loc in second] == ["Refuge du Lac"]
+
+
+@pytest.mark.asyncio
+async def test_truncated_area_is_not_refetched(monkeypatch):
+    from outdoor_mcp.core.settings import settings
+
+    monkeypatch.setattr(settings, "name_index_fetch_limit", len(ELEMENTS))
+    http = FakeHttp()
+    provider = OverpassProvider(ProviderContext(http=http, limiter=RateLimiter(100)))
+
+    await provider.search_locations(45.0, 6.0, radius_km=2, query="Côte")
+    await provider.search_locations(45.001, 6.0, radius_km=2, query="refuge")
+
+    # Area fetch, regex fallback, then the regex only: the dense area is not fetched again.
+    assert len(http.queries) == 3
+    assert ["name~" in q for q in http.queries] == [False, True, True]
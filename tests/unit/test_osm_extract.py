@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from outdoor_mcp.providers.osm_extract import OSMExtractProvider
+
+
+@pytest.fixture
+def extract(tmp_path):
+    dump = {
+        "elements": [
+            {"type": "node", "id": 1, "lat": 40.0, "lon": -105.0, "tags": {"name": "Bear Lake", "natural": "water"}},
+            {"type": "node", "id": 2, "lat": 40.01, "lon": -105.0, "tags": {"name": "Bear Peak", "natural": "peak"}},
+            {"type": "node", "id": 3, "lat": 40.5, "lon": -105.5, "tags": {"name": "Far Hut", "tourism": "alpine_hut"}},
+            {"type": "node", "id": 10, "lat": 40.002, "lon": -105.001},
+            {"type": "node", "id": 11, "lat": 40.004, "lon": -105.003},
+            {"type": "way", "id": 20, "nodes": [10, 11], "tags": {"name": "Lake Loop", "highway": "path"}},
+        ]
+    }
+    path = tmp_path / "extract.json"
+    path.write_text(json.dumps(dump))
+    return OSMExtractProvider([str(path)], cell_deg=0.05)
+
+
+@pytest.mark.asyncio
+async def test_extract_search_orders_by_distance_and_filters_name(extract):
+    results = await extract.search_locations(40.0, -105.0, radius_km=5, query="bear", limit=10)
+    assert [loc.name for loc in results] == ["Bear Lake", "Bear Peak"]
+    assert all(loc.source == "osm_extract" for loc in results)
+
+
+@pytest.mark.asyncio
+async def test_extract_search_normalizes_like_the_name_index(tmp_path):
+    dump = {"elements": [{"type": "node", "id": 1, "lat": 45.0, "lon": 6.0, "tags": {"name": "Côte-d'Or"}}]}
+    path = tmp_path / "accents.json"
+    path.write_text(json.dumps(dump))
+    extract = OSMExtractProvider([str(path)])
+
+    results = await extract.search_locations(45.0, 6.0, radius_km=5, query="cote d or", limit=10)
+
+    assert [loc.name for loc in results] == ["Côte-d'Or"]
+
+
+@pytest.mark.asyncio
+async def test_extract_features_resolve_way_nodes(extract):
+    features = await extract.nearby_features(40.0, -105.0, radius_km=3)
+    assert {f.name for f in features} == {"Bear Lake", "Bear Peak", "Lake Loop"}
+
+
+def test_extract_coverage(extract):
+    assert extract.covers(40.2, -105.2, radius_km=5)
+    assert not extract.covers(45.0, -110.0, radius_km=5)
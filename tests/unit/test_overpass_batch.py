@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from outdoor_mcp.providers.overpass_batch import OverpassBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_post_and_split_by_marker():
+    posts: list[str] = []
+
+    async def run(body: str, timeout_s: int):
+        posts.append(body)
+        return [
+            {"type": "node", "id": 1},
+            {"type": "batch_split", "id": 1, "tags": {"idx": "0"}},
+            {"type": "node", "id": 2},
+            {"type": "node", "id": 3},
+            {"type": "batch_split", "id": 2, "tags": {"idx": "1"}},
+        ]
+
+    batcher = OverpassBatcher(run, window_s=0.01, max_batch=8)
+    a, b = await asyncio.gather(batcher.submit("(node(1);); out;"), batcher.submit("(node(2);); out;"))
+
+    assert len(posts) == 1
+    assert [el["id"] for el in a] == [1]
+    assert [el["id"] for el in b] == [2, 3]
+    assert batcher.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_propagates_to_every_caller():
+    async def run(body: str, timeout_s: int):
+        raise RuntimeError("boom")
+
+    batcher = OverpassBatcher(run, window_s=0.01, max_batch=8)
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_by_combined_server_timeout():
+    timeouts: list[int] = []
+
+    async def run(body: str, timeout_s: int):
+        timeouts.append(timeout_s)
+        return [{"type": "batch_split", "id": i, "tags": {"idx": str(i)}} for i in range(body.count("batch_split"))]
+
+    batcher = OverpassBatcher(run, window_s=0.01, max_batch=8, timeout_s=25, max_timeout_s=100)
+    await asyncio.gather(*(batcher.submit(f"(node({i});); out;") for i in range(6)))
+
+    assert sorted(timeouts) == [50, 100]
+
+
+@pytest.mark.asyncio
+async def test_merged_query_gets_a_scaled_http_timeout():
+    import httpx
+
+    from outdoor_mcp.core.rate_limiter import RateLimiter
+    from outdoor_mcp.core.settings import settings
+    from outdoor_mcp.providers.base import ProviderContext
+    from outdoor_mcp.providers.overpass import QUERY_TIMEOUT_S, OverpassProvider
+
+    seen: list[float] = []
+
+    class FakeHttp:
+        async def request_cached(self, method, url, *, parse, timeout=None, **kwargs):
+            seen.append(timeout)
+            return parse(httpx.Response(200, json={"elements": []}))
+
+    provider = OverpassProvider(ProviderContext(http=FakeHttp(), limiter=RateLimiter(100)))
+    await provider._post("(node(1);); out;", QUERY_TIMEOUT_S)
+    await provider._post("(node(1);); out;", QUERY_TIMEOUT_S * 3)
+
+    assert seen == [settings.overpass_timeout_s, settings.overpass_timeout_s * 3]
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from outdoor_mcp.core.exceptions import ProviderError
+from outdoor_mcp.providers.overpass_mirrors import MirrorPool
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_to_next_mirror():
+    pool = MirrorPool(["https://a", "https://b"], hedge_min_delay_s=0.02)
+    # Hedging starts once the primary has a latency history.
+    pool.mirrors[0].latencies.extend([0.01] * 5)
+    pool.mirrors[0].ewma_latency_s = 0.01
+    pool.mirrors[1].ewma_latency_s = 0.02
+    delays = {"https://a": 1.0, "https://b": 0.0}
+
+    async def send(url):
+        await asyncio.sleep(delays[url])
+        return url
+
+    assert await pool.call(send) == "https://b"
+    assert pool.hedged == 1
+    await asyncio.sleep(0.01)  # let the cancelled primary record its lower bound
+    a = pool.mirrors[0]
+    # The loser's cut-short call is not a latency sample.
+    assert list(a.latencies) == [0.01] * 5 and a.ewma_latency_s == 0.01 and a.error_rate == 0.0
+    assert pool.ranked()[0].url == "https://b"
+
+
+@pytest.mark.asyncio
+async def test_no_hedging_without_latency_history():
+    pool = MirrorPool(["https://a", "https://b"], hedge_min_delay_s=0.01)
+    sent = []
+
+    async def send(url):
+        sent.append(url)
+        await asyncio.sleep(0.05)
+        return url
+
+    assert await pool.call(send) == "https://a"
+    assert sent == ["https://a"] and pool.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_fails_over_and_cools_down():
+    pool = MirrorPool(["https://a", "https://b"], hedge_min_delay_s=0.5)
+
+    async def send(url):
+        if url == "https://a":
+            raise ProviderError(code="overpass_http_error", message="down", details={"status": 503})
+        return url
+
+    assert await pool.call(send) == "https://b"
+    snapshot = {m["url"]: m for m in pool.snapshot()}
+    assert snapshot["https://a"]["healthy"] is False
+    assert pool.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_query_errors_do_not_bench_the_mirror():
+    pool = MirrorPool(["https://a", "https://b"], hedge_min_delay_s=0.5)
+    sent = []
+
+    async def send(url):
+        sent.append(url)
+        raise ProviderError(code="overpass_http_error", message="bad query", details={"status": 400})
+
+    with pytest.raises(ProviderError):
+        await pool.call(send)
+    assert sent == ["https://a"]
+    assert all(m["healthy"] for m in pool.snapshot())
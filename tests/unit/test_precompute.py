@@ -0,0 +1,68 @@
+import pytest
+
+from outdoor_mcp.core.shared_state import SharedStateStore
+from outdoor_mcp.precompute import Cell, Precompute, cells_for_bbox
+from outdoor_mcp.utils.geo import haversine_km
+
+
+def test_bbox_tiles_cover_every_corner():
+    cells = cells_for_bbox(44.0, -111.0, 44.5, -110.0, cell_km=5.0)
+    assert len(cells) > 1
+    for lat, lon in [(44.0, -111.0), (44.5, -110.0), (44.25, -110.5)]:
+        assert min(haversine_km(lat, lon, c.lat, c.lon) for c in cells) <= 5.0
+
+
+class FakeMCP:
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        args = arguments["args"]
+        self.calls.append((name, args.get("location_id")))
+        if name == "search_locations":
+            return [], {"ok": True, "data": {"locations": [{"id": "osm:node:1:44.1:-110.1"}], "next_cursor": None}}
+        if name == "get_real_time_conditions":
+            return [], {"ok": False, "error": {"code": "quota_exhausted"}}
+        return [], {"ok": True, "data": {}}
+
+
+class FakeServer:
+    def __init__(self):
+        self.mcp = FakeMCP()
+        self.catalog_fetches = 0
+
+    async def prefetch_catalogs(self):
+        self.catalog_fetches += 1
+        return {"nps_parks": 3}
+
+
+@pytest.mark.asyncio
+async def test_rerun_skips_completed_tasks(tmp_path):
+    store = SharedStateStore(str(tmp_path / "state.sqlite3"))
+    cells = [Cell(44.1, -110.1, 5.0)]
+
+    first = await Precompute(FakeServer(), store, "job", concurrency=2, features_radius_km=3.0, conditions=True).run(cells)
+    assert first["done"] == 1 and first["deferred"] == 1
+
+    server = FakeServer()
+    second = await Precompute(server, store, "job", concurrency=2, features_radius_km=3.0, conditions=True).run(cells)
+    store.close()
+
+    assert second["skipped"] == 1
+    # Only the deferred conditions task is retried.
+    assert ("get_location_profile", "osm:node:1:44.1:-110.1") not in server.mcp.calls
+    assert ("get_real_time_conditions", "osm:node:1:44.1:-110.1") in server.mcp.calls
+
+
+@pytest.mark.asyncio
+async def test_catalogs_are_fetched_once_and_conditions_are_opt_in(tmp_path):
+    store = SharedStateStore(str(tmp_path / "state.sqlite3"))
+    server = FakeServer()
+    cells = [Cell(44.1, -110.1, 5.0), Cell(44.2, -110.1, 5.0)]
+
+    summary = await Precompute(server, store, "job", concurrency=2, features_radius_km=3.0).run(cells)
+    store.close()
+
+    assert server.catalog_fetches == 1
+    assert summary["done"] == 1
+    assert all(name != "get_real_time_conditions" for name, _ in server.mcp.calls)
@@ -0,0 +1,30 @@
+import pytest
+
+from outdoor_mcp.core.exceptions import ValidationError
+from outdoor_mcp.models.common import Coordinates
+from outdoor_mcp.models.location import Location, LocationProfile, NearbyFeature
+from outdoor_mcp.tools.projection import project
+
+
+def make_profile():
+    return LocationProfile(
+        location=Location(id="osm:node:1:1:2", name="Lake", kind="poi", center=Coordinates(lat=1, lon=2)),
+        features=[NearbyFeature(kind="peak", name="Summit", center=Coordinates(lat=1, lon=2), tags={"ele": "3000"})],
+        summary={"feature_count": "1"},
+    )
+
+
+def test_standard_detail_drops_feature_tags():
+    data = project(make_profile(), "standard")
+    assert data["features"] == [{"kind": "peak", "name": "Summit", "center": {"lat": 1.0, "lon": 2.0}}]
+    assert data["location"]["id"] == "osm:node:1:1:2"
+
+
+def test_explicit_fields_override_detail():
+    data = project(make_profile(), "minimal", ["features.name", "location.center.lat"])
+    assert data == {"features": [{"name": "Summit"}], "location": {"center": {"lat": 1.0}}}
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValidationError):
+        project(make_profile(), fields=["features.nope"])
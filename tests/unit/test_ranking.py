@@ -0,0 +1,30 @@
+import pytest
+
+from outdoor_mcp.providers.ranking import rank_elements
+from outdoor_mcp.utils.geo import haversine_km, haversine_many
+
+
+def test_haversine_many_matches_scalar_version():
+    points = [(40.0, -105.0), (40.5, -104.2), (-33.9, 151.2)]
+    batch = haversine_many(40.1, -105.1, [p[0] for p in points], [p[1] for p in points])
+    for (lat, lon), dist in zip(points, batch):
+        assert dist == pytest.approx(haversine_km(40.1, -105.1, lat, lon), rel=1e-9)
+
+
+def test_rank_prefers_near_and_relevant_elements():
+    elements = [
+        {"type": "node", "id": 1, "lat": 40.05, "lon": -105.0, "tags": {"name": "Far Cafe", "amenity": "cafe"}},
+        {"type": "node", "id": 2, "lat": 40.002, "lon": -105.0, "tags": {"name": "Bench", "amenity": "bench"}},
+        {"type": "way", "id": 3, "center": {"lat": 40.003, "lon": -105.0}, "tags": {"name": "Ridge Trail", "highway": "path"}},
+        {"type": "node", "id": 4, "lat": 40.0027, "lon": -105.0, "tags": {}},
+        {"type": "way", "id": 5, "tags": {"name": "No Center"}},
+    ]
+    ranked = rank_elements(40.0, -105.0, elements, limit=3)
+
+    assert [el["id"] for el, _ in ranked] == [3, 2, 4]
+    assert ranked[0][1] == pytest.approx(0.334, abs=0.01)
+
+
+def test_rank_applies_radius():
+    elements = [{"type": "node", "id": 1, "lat": 41.0, "lon": -105.0, "tags": {"name": "Far"}}]
+    assert rank_elements(40.0, -105.0, elements, limit=10, radius_km=5) == []
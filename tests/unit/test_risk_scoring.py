@@ -4,10 +4,10 @@ from outdoor_mcp.models.conditions import RealTimeConditions, WeatherConditions
 from outdoor_mcp.models.common import Coordinates
 
 
-def make_conditions(temp_c: float, wind: float, rain: float):
+def make_conditions(temp_c: float, wind: float, rain: float, lat: float = 0.0, lon: float = 0.0):
     return RealTimeConditions(
         weather=WeatherConditions(
-            at=Coordinates(lat=0.0, lon=0.0),
+            at=Coordinates(lat=lat, lon=lon),
             observed_at_iso=dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
             temperature_c=temp_c,
             feels_like_c=temp_c,
@@ -25,3 +25,13 @@ def test_risk_increases_with_extreme_weather():
     low = svc.assess(make_conditions(20, 2, 0), feature_count=40).risk_score
     high = svc.assess(make_conditions(38, 16, 12), feature_count=40).risk_score
     assert high > low
+
+
+def test_daylight_uses_local_sun_position():
+    svc = RiskService()
+    when = "2026-01-03T18:00:00Z"
+    denver = svc.assess(make_conditions(20, 2, 0, lat=39.74, lon=-104.99), feature_count=40, when_iso=when)
+    tokyo = svc.assess(make_conditions(20, 2, 0, lat=35.68, lon=139.69), feature_count=40, when_iso=when)
+    assert denver.breakdown.daylight == 10
+    assert tokyo.breakdown.daylight == 55
+    assert denver.evidence["sun"]["sunrise"].startswith("2026-01-03T14:2")
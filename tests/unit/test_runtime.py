@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+import pytest
+
+from outdoor_mcp.core.runtime import LoopWatchdog, install_event_loop
+
+
+def _blocking_parse():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_records_lag_and_blocking_stack():
+    dog = LoopWatchdog(interval_s=0.02, threshold_s=0.1)
+    dog.start()
+    try:
+        await asyncio.sleep(0.1)
+        _blocking_parse()
+        await asyncio.sleep(0.05)
+    finally:
+        await dog.stop()
+
+    snap = dog.snapshot(include_stacks=True)
+    assert snap["stall_count"] >= 1
+    assert "_blocking_parse" in snap["recent_stalls"][0]["stack"]
+    assert snap["lag"]["max_ms"] >= 150
+
+
+def test_standard_mode_keeps_asyncio_loop():
+    assert install_event_loop("standard") == "asyncio"
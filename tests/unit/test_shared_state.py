@@ -0,0 +1,72 @@
+from outdoor_mcp.core.cache import TTLCache
+from outdoor_mcp.core.shared_state import SharedStateStore
+
+
+def test_shared_cache_visible_across_instances(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    a = TTLCache(default_ttl_s=10, shared=SharedStateStore(path))
+    b = TTLCache(default_ttl_s=10, shared=SharedStateStore(path))
+
+    a.set("k", {"x": 1})
+    entry = b.get("k")
+
+    assert entry is not None
+    assert entry.value == {"x": 1}
+
+
+def test_shared_token_bucket_is_global(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    s1 = SharedStateStore(path)
+    s2 = SharedStateStore(path)
+
+    granted = [s.take_token("upstream", rate_per_s=0.001, capacity=2) for s in (s1, s2, s1, s2)]
+
+    assert granted == [True, True, False, False]
+
+
+def test_busy_store_is_skipped_instead_of_blocking(tmp_path):
+    import time
+
+    path = str(tmp_path / "shared.sqlite3")
+    holder = SharedStateStore(path)
+    store = SharedStateStore(path, busy_timeout_s=0.01)
+    holder._conn.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.monotonic()
+        store.cache_set("k", {"x": 1}, time.time() + 60, time.time())
+        granted = store.take_token("upstream", rate_per_s=1.0, capacity=1)
+        elapsed = time.monotonic() - start
+    finally:
+        holder._conn.execute("ROLLBACK")
+
+    assert granted is False
+    assert store.busy == 2
+    assert elapsed < 0.5
+    assert store.cache_get("k") is None
+
+
+def test_expired_rows_are_purged_on_writes(tmp_path):
+    import time
+
+    store = SharedStateStore(str(tmp_path / "shared.sqlite3"), purge_interval_s=0.01)
+    store.cache_set("old", 1, time.time() - 1, time.time() - 10)
+    time.sleep(0.02)
+    store.cache_set("new", 2, time.time() + 60, time.time())
+
+    assert store._conn.execute("SELECT key FROM cache").fetchall() == [("new",)]
+
+
+def test_every_store_call_degrades_when_busy(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    holder = SharedStateStore(path)
+    store = SharedStateStore(path, busy_timeout_s=0.01)
+    holder._conn.execute("BEGIN EXCLUSIVE")
+    try:
+        assert store.budget_spend("openweather", 10, 3600) is None
+        assert store.locations_put([("id", "{}")], keep=10) is False
+        store.progress_mark("job", "task", "done")
+    finally:
+        holder._conn.execute("ROLLBACK")
+
+    assert store.busy == 3
+    assert store.progress_done("job") == set()
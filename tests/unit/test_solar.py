@@ -0,0 +1,25 @@
+import datetime as dt
+
+from outdoor_mcp.utils.solar import sun_times, sun_times_many
+
+
+def _utc(ts):
+    return dt.datetime.fromtimestamp(ts, dt.timezone.utc)
+
+
+def test_greenwich_midsummer_sunrise_and_sunset():
+    sun = sun_times(51.48, 0.0, dt.date(2024, 6, 21))
+    assert abs(_utc(sun.sunrise) - dt.datetime(2024, 6, 21, 3, 43, tzinfo=dt.timezone.utc)) < dt.timedelta(minutes=3)
+    assert abs(_utc(sun.sunset) - dt.datetime(2024, 6, 21, 20, 21, tzinfo=dt.timezone.utc)) < dt.timedelta(minutes=3)
+    assert sun.civil_dawn < sun.sunrise < sun.sunset < sun.civil_dusk
+
+
+def test_polar_day_and_night():
+    assert sun_times(78.2, 15.6, dt.date(2024, 6, 21)).polar == "day"
+    assert sun_times(78.2, 15.6, dt.date(2024, 12, 21)).polar == "night"
+
+
+def test_batch_matches_single_point():
+    points = [(51.48, 0.0), (39.74, -104.99), (51.48, 0.0)]
+    day = dt.date(2024, 6, 21)
+    assert sun_times_many(points, day) == [sun_times(lat, lon, day) for lat, lon in points]
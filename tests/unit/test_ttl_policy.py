@@ -0,0 +1,41 @@
+import datetime as _dt
+
+import pytest
+
+from outdoor_mcp.core.cache import TTLCache
+from outdoor_mcp.core.ttl_policy import TTLPolicy
+from outdoor_mcp.models.common import Coordinates
+from outdoor_mcp.models.conditions import RealTimeConditions, WeatherConditions
+
+NOW = 1_760_000_000.0
+
+
+def _weather(observed_at: float) -> WeatherConditions:
+    iso = _dt.datetime.fromtimestamp(observed_at, tz=_dt.timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+    return WeatherConditions(at=Coordinates(lat=45.0, lon=-110.0), observed_at_iso=iso)
+
+
+def test_weather_expires_at_next_expected_observation():
+    policy = TTLPolicy(weather_interval_s=600, weather_min_ttl_s=60, weather_max_ttl_s=900)
+    assert policy.weather(_weather(NOW - 200), now=NOW) == 400
+    # Overdue observation: recheck soon instead of caching stale weather.
+    assert policy.weather(_weather(NOW - 3600), now=NOW) == 60
+
+
+def test_conditions_ttl_is_bounded_by_alerts_ttl():
+    policy = TTLPolicy(alerts_ttl_s=120, weather_interval_s=600)
+    conditions = RealTimeConditions(weather=_weather(NOW - 10))
+    assert policy.conditions(conditions, now=NOW) == 120
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_derives_ttl_from_value():
+    cache = TTLCache(600)
+
+    async def factory():
+        return {"ttl": 42}
+
+    _, meta = await cache.get_or_set("k", factory, ttl_s=lambda value: value["ttl"])
+    assert meta["ttl_s"] == 42
+    _, meta = await cache.get_or_set("k", factory, ttl_s=lambda value: value["ttl"])
+    assert meta["hit"] and meta["ttl_s"] == 42
@@ -0,0 +1,19 @@
+import signal
+import sys
+
+import pytest
+
+from outdoor_mcp.core.workers import serve_prefork
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pre-fork workers need fork")
+def test_workers_do_not_inherit_the_supervisor_signal_handlers(tmp_path):
+    out = tmp_path / "handlers.txt"
+
+    def target(sock):
+        with open(out, "a", encoding="utf-8") as f:
+            f.write(f"{signal.getsignal(signal.SIGTERM) == signal.SIG_DFL}\n")
+
+    serve_prefork(2, "127.0.0.1", 0, target)
+
+    assert out.read_text().split() == ["True", "True"]